@@ -0,0 +1,235 @@
+import argparse
+import datetime
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+from core.config import CONFIG, WATCH_DIR, WATCH_ROOTS, validate_config
+from core.journal import default_journal
+from core.metrics import METRICS
+from core.organizer import DirOrganizer
+from core.resort import applied_folders, record_applied_rules, resort
+from utils.file_utils import validate_directory
+
+
+class HeadlessApp:
+    """
+    Stand-in for FileOrganizerGUI when running without a display.
+    Every log call is written to stdout as one JSON object per line.
+    """
+
+    def __init__(self, stream=sys.stdout):
+        self.stream = stream
+        self.is_watching = False
+        self.is_organizing = False
+        self.stop_requested = False
+        self.file_count = 0
+        self._lock = threading.Lock()
+
+    def log(self, message, message_type="info"):
+        self._write({
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "type": message_type,
+            "message": message,
+            "organized": self.file_count,
+        })
+
+    def stats(self):
+        self._write({
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "type": "stats",
+            "stats": METRICS.snapshot(),
+        })
+
+    def _write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def increment_file_count(self):
+        with self._lock:
+            self.file_count += 1
+
+    def request_stop(self, *_):
+        self.stop_requested = True
+        self.is_watching = False
+
+
+def organize(app, directory, roots=()):
+    app.is_organizing = True
+    organizer = DirOrganizer(directory, app, roots=roots)
+    for root in organizer.roots:
+        app.log(f"Starting to organize existing files in: {root}", "info")
+    organizer._classify_existing_files_gui()
+    app.is_organizing = False
+    app.stats()
+    return 0
+
+
+def watch(app, directory, skip_existing=False, roots=()):
+    organizer = DirOrganizer(directory, app, roots=roots)
+    if not skip_existing:
+        app.is_organizing = True
+        organizer._classify_existing_files_gui()
+        app.is_organizing = False
+        if app.stop_requested:
+            return 0
+
+    app.is_watching = True
+    organizer.start_gui()
+    app.log("File watcher stopped.", "warning")
+    app.stats()
+    return 0
+
+
+def plan(app, directory, list_moves=False, execute=False, stream=sys.stdout):
+    organizer = DirOrganizer(directory, app)
+    started = time.perf_counter()
+    move_plan = organizer.plan()
+    elapsed = time.perf_counter() - started
+
+    if list_moves:
+        for move in move_plan:
+            stream.write(json.dumps(move._asdict(), ensure_ascii=False) + "\n")
+    summary = move_plan.summary()
+    summary["seconds"] = round(elapsed, 3)
+    stream.write(json.dumps(summary, ensure_ascii=False) + "\n")
+    stream.flush()
+
+    if execute and not app.stop_requested:
+        app.is_organizing = True
+        organizer.execute_plan(move_plan)
+        app.is_organizing = False
+    return 0
+
+
+def resort_folders(app, directory, roots=()):
+    organizer = DirOrganizer(directory, app, roots=roots)
+    for root in organizer.roots:
+        if app.stop_requested:
+            break
+        old_folders = applied_folders(root)
+        if old_folders is None:
+            app.log(f"No earlier rules recorded for {root}, recording the current ones", "warning")
+            record_applied_rules(root, organizer.rules_for(root))
+            continue
+        processed = resort(organizer, root, old_folders)
+        app.log(f"Re-sorted {processed} files in {root}", "success")
+    app.stats()
+    return 0
+
+
+def last_run_id(journal):
+    # Fully undone runs are skipped, so undoing again reaches the run before
+    runs = [run for run in journal.runs() if run["moves"] > run["undone"]]
+    return runs[-1]["id"] if runs else None
+
+
+def undo(app, journal, run_id=None, since=None, until=None):
+    if run_id is None and since is None and until is None:
+        run_id = last_run_id(journal)
+        if run_id is None:
+            app.log("Nothing to undo.", "warning")
+            return 0
+    restored = journal.undo(run_id=run_id, since=since, until=until, log=app.log)
+    app.log(f"Restored {restored} files to their original location", "success")
+    return 0
+
+
+def list_runs(journal, stream=sys.stdout):
+    for run in journal.runs():
+        stream.write(json.dumps(run, ensure_ascii=False) + "\n")
+    return 0
+
+
+def parse_time(value):
+    """Epoch seconds or an ISO date/time such as 2024-05-01T09:30."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value).timestamp()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="autosort",
+        description="Organize a folder by file category without the GUI.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    organize_cmd = commands.add_parser("organize", help="organize existing files once and exit")
+    organize_cmd.add_argument("directory", nargs="?",
+                              help="defaults to every folder configured in config.json")
+
+    watch_cmd = commands.add_parser("watch", help="organize existing files, then watch for new ones")
+    watch_cmd.add_argument("directory", nargs="?",
+                           help="defaults to every folder configured in config.json")
+    watch_cmd.add_argument("--skip-existing", action="store_true",
+                           help="do not organize files already in the folder")
+
+    plan_cmd = commands.add_parser("plan", help="show what organizing would do, without moving anything")
+    plan_cmd.add_argument("directory", nargs="?", default=WATCH_DIR)
+    plan_cmd.add_argument("--list", action="store_true", help="print every planned move")
+    plan_cmd.add_argument("--execute", action="store_true", help="carry out the plan afterwards")
+
+    resort_cmd = commands.add_parser("resort", help="move already-sorted files whose category changed")
+    resort_cmd.add_argument("directory", nargs="?",
+                            help="defaults to every folder configured in config.json")
+
+    commands.add_parser("runs", help="list the runs recorded in the move journal")
+
+    undo_cmd = commands.add_parser("undo", help="move files back (defaults to the last run)")
+    undo_cmd.add_argument("--run", type=int, help="run id, as shown by `runs`")
+    undo_cmd.add_argument("--since", type=parse_time, help="undo moves made at or after this time")
+    undo_cmd.add_argument("--until", type=parse_time, help="undo moves made at or before this time")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    app = HeadlessApp()
+
+    if args.command in ("runs", "undo"):
+        journal = default_journal()
+        if journal is None:
+            app.log("The move journal is turned off in config.json.", "error")
+            return 2
+        if args.command == "runs":
+            return list_runs(journal)
+        return undo(app, journal, args.run, args.since, args.until)
+
+    try:
+        validate_config(CONFIG)
+    except ValueError as e:
+        app.log(f"Invalid config.json: {e}", "error")
+        return 2
+
+    # Without an explicit folder, organize/watch serve every configured root
+    roots = ()
+    if args.directory is None and args.command != "plan":
+        args.directory, roots = WATCH_DIR, WATCH_ROOTS
+    directories = [args.directory] if args.directory else []
+    directories += [root if isinstance(root, str) else root.get("path", "") for root in roots]
+    if not directories:
+        app.log("No directory given.", "error")
+        return 2
+    for directory in directories:
+        valid, msg = validate_directory(os.path.expanduser(directory))
+        if not valid:
+            app.log(msg, "error")
+            return 2
+
+    signal.signal(signal.SIGINT, app.request_stop)
+    signal.signal(signal.SIGTERM, app.request_stop)
+
+    if args.command == "organize":
+        return organize(app, args.directory, roots)
+    if args.command == "plan":
+        return plan(app, args.directory, args.list, args.execute)
+    if args.command == "resort":
+        return resort_folders(app, args.directory, roots)
+    return watch(app, args.directory, skip_existing=args.skip_existing, roots=roots)
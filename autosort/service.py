@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+from collections import namedtuple
+
+from core.config import WATCH_DIR
+from core.organizer import DirOrganizer
+
+EVENT_BUFFER = 10000  # Move events kept per events() consumer before the oldest are dropped
+
+MoveEvent = namedtuple("MoveEvent", ["status", "file_name", "detail", "time"])
+LogEvent = namedtuple("LogEvent", ["message", "type", "time"])
+
+_CLOSED = object()
+
+
+class _ServiceApp:
+    """The app object the organizer reports to; everything is forwarded to the event loop."""
+
+    def __init__(self, service):
+        self.service = service
+        self.is_watching = False
+        self.is_organizing = False
+        self.stop_requested = False
+        self.file_count = 0
+        self._lock = threading.Lock()
+
+    def log(self, message, message_type="info"):
+        self.service._emit(LogEvent(message, message_type, time.time()))
+
+    def increment_file_count(self):
+        with self._lock:
+            self.file_count += 1
+
+
+class _ServiceOrganizer(DirOrganizer):
+    def report(self, result):
+        super().report(result)
+        status, file_name, detail = result
+        self.gui_app.service._emit(MoveEvent(status, file_name, detail, time.time()))
+
+
+class AsyncOrganizer:
+    """
+    asyncio front end for DirOrganizer, with no GUI object and no polling loop.
+
+        async with AsyncOrganizer("/srv/inbox", sinks=[print]) as organizer:
+            await organizer.organize()
+            async for event in organizer.events():
+                ...
+
+    Entering the context starts watching (watch=False to only run bulk jobs);
+    leaving it stops the observer and workers. Sinks are called on the event
+    loop with every MoveEvent and LogEvent and may be coroutine functions.
+    Keyword arguments are passed on to DirOrganizer (roots, recursive, ...).
+    """
+
+    def __init__(self, watch_dir=WATCH_DIR, watch=True, sinks=(), **organizer_options):
+        self.watch_dir = watch_dir
+        self.watch = watch
+        self.sinks = list(sinks)
+        self.organizer_options = organizer_options
+        self.app = _ServiceApp(self)
+        self.organizer = None
+        self._loop = None
+        self._subscribers = []
+        self._tasks = set()
+        self._run_lock = None
+
+    async def __aenter__(self):
+        self._loop = asyncio.get_running_loop()
+        self._run_lock = asyncio.Lock()
+        self.organizer = await self._in_thread(self._new_organizer)
+        if self.watch:
+            self.app.is_watching = True
+            await self._in_thread(self.organizer.start_watching)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self.app.is_watching:
+            self.app.is_watching = False
+            await self._in_thread(self.organizer.stop_watching)
+        for queue in self._subscribers:
+            _put_dropping_oldest(queue, _CLOSED)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        return False
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    async def events(self):
+        """Yield a MoveEvent for every file handled, until the context exits."""
+        queue = asyncio.Queue(EVENT_BUFFER)
+        self._subscribers.append(queue)
+        try:
+            while True:
+                event = await queue.get()
+                if event is _CLOSED:
+                    return
+                yield event
+        finally:
+            self._subscribers.remove(queue)
+
+    async def organize(self, directory=None):
+        """
+        Organize the files already in `directory` (default: every watched
+        folder). Returns the number of files processed. Cancelling the task
+        stops the run at the next file and waits for in-flight moves.
+        """
+        def run():
+            # A separate organizer, so the run's journal entries never mix with the watcher's
+            if directory is None:
+                organizer = self._new_organizer()
+            else:
+                options = dict(self.organizer_options, roots=())
+                organizer = _ServiceOrganizer(directory, self.app, **options)
+            return organizer._classify_existing_files_gui()
+
+        async with self._run_lock:
+            return await self._cancellable(run)
+
+    async def plan(self, directory=None):
+        """The MovePlan for `directory` (default: the first watched folder); nothing is moved."""
+        async with self._run_lock:
+            return await self._cancellable(lambda: self.organizer.plan(directory))
+
+    async def _cancellable(self, func):
+        future = self._loop.run_in_executor(None, func)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # The bulk engine checks stop_requested between files
+            self.app.stop_requested = True
+            try:
+                await future
+            finally:
+                self.app.stop_requested = False
+            raise
+
+    def _new_organizer(self):
+        return _ServiceOrganizer(self.watch_dir, self.app, **self.organizer_options)
+
+    def _in_thread(self, func):
+        return self._loop.run_in_executor(None, func)
+
+    def _emit(self, event):
+        # Called from organizer threads; hop onto the loop before touching asyncio objects
+        try:
+            self._loop.call_soon_threadsafe(self._dispatch, event)
+        except RuntimeError:
+            pass  # the loop has already closed
+
+    def _dispatch(self, event):
+        if isinstance(event, MoveEvent):
+            for queue in self._subscribers:
+                _put_dropping_oldest(queue, event)
+        for sink in self.sinks:
+            result = sink(event)
+            if asyncio.iscoroutine(result):
+                task = self._loop.create_task(result)
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+
+def _put_dropping_oldest(queue, item):
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
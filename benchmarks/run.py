@@ -0,0 +1,259 @@
+"""
+Reproducible performance benchmarks for AutoSort.
+
+Everything runs headless in a temporary folder and the results are printed
+as one JSON document, so they can be stored and compared between commits:
+
+    python -m benchmarks.run --files 20000 --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from core.bulk import BulkOrganizer
+from core.config import FILE_CATEGORIES
+from core.organizer import DirOrganizer
+from core.rules import RuleIndex
+from utils.file_utils import NameIndex, resolve_duplicate
+
+UNKNOWN_EXTENSIONS = [".bin", ".dat", ".xyz", ""]
+
+
+class SilentApp:
+    """Headless stand-in for the GUI that discards log output."""
+
+    def __init__(self):
+        self.is_watching = False
+        self.stop_requested = False
+        self.file_count = 0
+        self._lock = threading.Lock()
+
+    def log(self, message, message_type="info"):
+        pass
+
+    def increment_file_count(self):
+        with self._lock:
+            self.file_count += 1
+
+
+def known_extensions(categories):
+    extensions = []
+    for value in categories.values():
+        if isinstance(value, dict):
+            extensions.extend(known_extensions(value))
+        else:
+            extensions.extend(value)
+    return extensions
+
+
+def make_names(count, unknown_ratio, seed):
+    rng = random.Random(seed)
+    known = [ext for ext in known_extensions(FILE_CATEGORIES) if ext not in FILE_CATEGORIES.get("Temp", [])]
+    names = []
+    for i in range(count):
+        ext = rng.choice(UNKNOWN_EXTENSIONS) if rng.random() < unknown_ratio else rng.choice(known)
+        names.append(f"file_{i:07d}{ext}")
+    return names
+
+
+def make_tree(root, names, collisions=0):
+    """
+    Create `names` as empty files in `root`. With `collisions`, every file's
+    destination folder is pre-filled with that many "(N)" copies of a few
+    hot names, so duplicate resolution has real work to do.
+    """
+    os.makedirs(root, exist_ok=True)
+    for name in names:
+        open(os.path.join(root, name), "w").close()
+
+    if collisions:
+        rules = RuleIndex(FILE_CATEGORIES)
+        for name in names[:10]:
+            destination_dir = rules.destination(name, root)
+            os.makedirs(destination_dir, exist_ok=True)
+            base, ext = os.path.splitext(name)
+            open(os.path.join(destination_dir, name), "w").close()
+            for n in range(1, collisions + 1):
+                open(os.path.join(destination_dir, f"{base} ({n}){ext}"), "w").close()
+
+
+def rate(count, seconds):
+    return round(count / seconds, 1) if seconds > 0 else None
+
+
+def bench_classification(names, repeat):
+    rules = RuleIndex(FILE_CATEGORIES)
+    base_dir = os.path.abspath("bench")
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for name in names:
+            rules.destination(name, base_dir)
+    elapsed = time.perf_counter() - started
+    return {"ops": len(names) * repeat, "seconds": round(elapsed, 4),
+            "ops_per_sec": rate(len(names) * repeat, elapsed)}
+
+
+def bench_duplicates(workdir, collisions, ops):
+    """
+    Resolve `ops` new copies of one hot name into a folder that already holds
+    `collisions` "(N)" copies of it: legacy probing vs NameIndex.
+    """
+    results = {"existing_copies": collisions}
+    for label in ("resolve_duplicate", "name_index"):
+        directory = os.path.join(workdir, f"dups_{label}")
+        os.makedirs(directory)
+        open(os.path.join(directory, "installer.exe"), "w").close()
+        for n in range(1, collisions + 1):
+            open(os.path.join(directory, f"installer ({n}).exe"), "w").close()
+
+        index = NameIndex()
+        target = os.path.join(directory, "installer.exe")
+        started = time.perf_counter()
+        for _ in range(ops):
+            if label == "resolve_duplicate":
+                open(resolve_duplicate(target), "w").close()
+            else:
+                index.claim(target)
+        elapsed = time.perf_counter() - started
+        results[label] = {"ops": ops, "seconds": round(elapsed, 4), "ops_per_sec": rate(ops, elapsed)}
+        shutil.rmtree(directory)
+    return results
+
+
+def bench_bulk(workdir, names, workers, collisions):
+    root = os.path.join(workdir, "bulk")
+    make_tree(root, names, collisions)
+    app = SilentApp()
+    organizer = DirOrganizer(root, app, journal=False, dedup_mode="off", entry_index=False)
+    started = time.perf_counter()
+    BulkOrganizer(organizer, workers=workers).run(root)
+    elapsed = time.perf_counter() - started
+    shutil.rmtree(root)
+    return {"files": len(names), "moved": app.file_count, "workers": workers,
+            "seconds": round(elapsed, 4), "files_per_sec": rate(app.file_count, elapsed)}
+
+
+class TimedOrganizer(DirOrganizer):
+    """Records when each file leaves the watched folder."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.finished = {}
+
+    def organize_file(self, file_path, base_dir, file_name=None):
+        result = super().organize_file(file_path, base_dir, file_name)
+        self.finished[file_path] = time.perf_counter()
+        return result
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def bench_watcher(workdir, events, interval, stability_interval, timeout):
+    root = os.path.join(workdir, "watch")
+    os.makedirs(root)
+    app = SilentApp()
+    app.is_watching = True
+    organizer = TimedOrganizer(root, app, journal=False, dedup_mode="off", entry_index=False)
+    if stability_interval is not None:
+        organizer.handler.tracker.interval = stability_interval
+    watcher = threading.Thread(target=organizer.start_gui, daemon=True)
+    watcher.start()
+    time.sleep(1.0)  # let the observer settle before measuring
+
+    created = {}
+    for name in make_names(events, 0.1, seed=7):
+        path = os.path.join(root, name)
+        with open(path, "wb") as f:
+            f.write(b"x" * 128)
+        created[path] = time.perf_counter()
+        if interval:
+            time.sleep(interval)
+
+    deadline = time.perf_counter() + timeout
+    while len(organizer.finished) < len(created) and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    app.is_watching = False
+    watcher.join()
+
+    latencies = [(organizer.finished[p] - t) * 1000 for p, t in created.items() if p in organizer.finished]
+    result = {"events": events, "handled": len(latencies), "backend": type(organizer.observer).__name__}
+    if latencies:
+        result.update({
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p90_ms": round(percentile(latencies, 0.90), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "max_ms": round(max(latencies), 2),
+            "mean_ms": round(statistics.fmean(latencies), 2),
+        })
+    shutil.rmtree(root)
+    return result
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="benchmarks.run", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=10000, help="files in the synthetic folder")
+    parser.add_argument("--unknown-ratio", type=float, default=0.1,
+                        help="share of files with an extension no category lists")
+    parser.add_argument("--collisions", type=int, default=1000,
+                        help="existing \"(N)\" copies per hot name in the destination folders")
+    parser.add_argument("--duplicate-ops", type=int, default=200, help="new copies resolved per method")
+    parser.add_argument("--workers", type=int, default=4, help="bulk organizer workers")
+    parser.add_argument("--repeat", type=int, default=5, help="classification passes over the names")
+    parser.add_argument("--events", type=int, default=500, help="files created while watching")
+    parser.add_argument("--event-interval", type=float, default=0.0, help="seconds between created files")
+    parser.add_argument("--stability-interval", type=float, default=None,
+                        help="override stability_interval for the watcher benchmark")
+    parser.add_argument("--timeout", type=float, default=60.0, help="max seconds to wait for the watcher")
+    parser.add_argument("--only", choices=["classification", "duplicates", "bulk", "watcher"], action="append",
+                        help="run only these benchmarks (repeatable)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    selected = set(args.only or ["classification", "duplicates", "bulk", "watcher"])
+    names = make_names(args.files, args.unknown_ratio, args.seed)
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": vars(args),
+    }
+    workdir = tempfile.mkdtemp(prefix="autosort-bench-")
+    try:
+        if "classification" in selected:
+            results["classification"] = bench_classification(names, args.repeat)
+        if "duplicates" in selected:
+            results["duplicates"] = bench_duplicates(workdir, args.collisions, args.duplicate_ops)
+        if "bulk" in selected:
+            results["bulk"] = bench_bulk(workdir, names, args.workers, args.collisions)
+        if "watcher" in selected:
+            results["watcher"] = bench_watcher(workdir, args.events, args.event_interval,
+                                               args.stability_interval, args.timeout)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
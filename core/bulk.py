@@ -0,0 +1,134 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from core.config import BULK_WORKERS
+from core.metrics import METRICS
+
+PROGRESS_EVERY = 10
+
+
+class BulkOrganizer:
+    """
+    Organizes the files already in a folder on a pool of worker threads.
+    Results are reported in scandir order from the calling thread, so the
+    app's log never sees concurrent writes.
+    """
+
+    def __init__(self, organizer, workers=BULK_WORKERS):
+        self.organizer = organizer
+        self.app = organizer.gui_app
+        self.workers = max(1, int(workers))
+
+    def run(self, directory=None):
+        directory = directory or self.organizer.watch_dir
+        if self.organizer.journal is None:
+            return self._execute(self.organizer.iter_changed_files(directory), directory)
+
+        # A stopped or crashed run is finished from its recorded plan first;
+        # files that arrived since are picked up by the walk that follows
+        processed = 0
+        journal = self.organizer.journal
+        run_id = journal.unfinished_run(directory)
+        if run_id is not None:
+            self.app.log("Resuming the previous, unfinished organization run...", "info")
+            processed = self._run_planned(run_id, directory, processed, final=False)
+            if self.app.stop_requested:
+                return processed
+
+        sources = (path for _, path in self.organizer.iter_changed_files(directory))
+        return self._run_journaled(directory, sources, processed)
+
+    def execute_plan(self, plan):
+        """Carry out a MovePlan, one destination folder after another."""
+        return self.run_paths(plan.base_dir, (plan.move(i).source for i in plan.grouped_order()))
+
+    def run_paths(self, directory, paths):
+        """Organize exactly `paths`, files under `directory`, in the order given."""
+        if self.organizer.journal is None:
+            return self._execute(self._pending(paths), directory)
+        return self._run_journaled(directory, paths)
+
+    def _run_journaled(self, directory, sources, processed=0):
+        # The file list is recorded first, so a run that was stopped or
+        # crashed resumes from its plan instead of a new walk
+        journal = self.organizer.journal
+        run_id = journal.begin(directory)
+        for path in sources:
+            if self.app.stop_requested:
+                break
+            journal.plan(run_id, path)
+        else:
+            journal.walked(run_id)
+        return self._run_planned(run_id, directory, processed)
+
+    def _run_planned(self, run_id, directory, processed, final=True):
+        journal = self.organizer.journal
+        self.organizer.run_id = run_id
+        processed = self._execute(self._pending(journal.planned(run_id)), directory, processed, final)
+        if not self.app.stop_requested:
+            journal.end(run_id)
+        return processed
+
+    @staticmethod
+    def _pending(paths):
+        for path in paths:
+            with METRICS.timer("stat"):
+                exists = os.path.isfile(path)
+            if exists:
+                yield os.path.basename(path), path
+
+    def _execute(self, files, directory, processed=0, final=True):
+        pending = deque()
+        window = self.workers * 4
+        # Files over small_file_bytes go to their own pool and are reported
+        # when they finish, so they never stall the small files behind them
+        scheduler = self.organizer.scheduler
+        lanes = scheduler is not None and scheduler.small_file_bytes
+        large = deque()
+        large_workers = scheduler.large_workers if lanes else 1
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="autosort-bulk") as pool, \
+                ThreadPoolExecutor(max_workers=large_workers, thread_name_prefix="autosort-large") as large_pool:
+            for name, path in files:
+                if self.app.stop_requested:
+                    break
+                if lanes and scheduler.is_large(path):
+                    large.append(large_pool.submit(self._move, name, path, directory))
+                else:
+                    pending.append(pool.submit(self._move, name, path, directory))
+                processed += self._drain(pending, window, processed)
+                processed += self._drain(large, None, processed)
+
+            processed += self._drain(pending, 0, processed)
+            processed += self._drain(large, 0, processed)
+
+        if self.app.stop_requested:
+            self.app.log(f"Organization stopped. Processed {processed} files.", "warning")
+            return processed
+
+        if final:
+            self.app.log(f"Organized {processed} existing files", "success")
+        return processed
+
+    def _drain(self, futures, limit, processed):
+        """Report finished results in order; block on the oldest while more than `limit` are queued."""
+        reported = 0
+        while futures and ((limit is not None and len(futures) > limit) or futures[0].done()):
+            reported += self._report(futures.popleft().result(), processed + reported)
+        return reported
+
+    def _report(self, result, processed):
+        if result[0] == "skipped":
+            return 0
+
+        self.organizer.report(result)
+        processed += 1
+        if processed % PROGRESS_EVERY == 0:
+            self.app.log(f"Progress: {processed} files processed...", "info")
+        return 1
+
+    def _move(self, file_name, file_path, base_dir):
+        if self.app.stop_requested:
+            return "skipped", file_name, None
+        return self.organizer.organize_file(file_path, base_dir, file_name)
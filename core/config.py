@@ -1,6 +1,8 @@
 import json
 import os
 
+from core.rules import RuleMatcher
+
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CONFIG_PATH = os.path.join(PROJECT_ROOT, "config.json")
 
@@ -10,10 +12,97 @@ def load_config():
     with open(CONFIG_PATH, "r") as f:
         return json.load(f)
 
+def validate_config(config):
+    """Raise ValueError describing the first problem that would stop `config` from being used."""
+    if not isinstance(config, dict):
+        raise ValueError("config.json must contain a JSON object")
+    _validate_categories(config.get("categories", {}), "categories")
+    _validate_rules(config.get("rules", []), "rules")
+    roots = config.get("watch_directories", [])
+    if not isinstance(roots, list):
+        raise ValueError("watch_directories must be a list")
+    for root in roots:
+        if isinstance(root, dict):
+            if not isinstance(root.get("path"), str):
+                raise ValueError("every watch_directories entry needs a \"path\"")
+            _validate_categories(root.get("categories", {}), f"categories of {root['path']}")
+            _validate_rules(root.get("rules", []), f"rules of {root['path']}")
+        elif not isinstance(root, str):
+            raise ValueError("watch_directories entries must be paths or objects")
+    if not isinstance(config.get("handle_duplicates", True), bool):
+        raise ValueError("handle_duplicates must be true or false")
+    return config
+
+def _validate_categories(node, where):
+    if not isinstance(node, dict):
+        raise ValueError(f"{where} must be an object")
+    for name, value in node.items():
+        if isinstance(value, dict):
+            _validate_categories(value, f"{where}/{name}")
+        elif not isinstance(value, list) or not all(isinstance(ext, str) and ext for ext in value):
+            raise ValueError(f"{where}/{name} must be a list of extensions")
+
+def _validate_rules(rules, where):
+    if not isinstance(rules, list):
+        raise ValueError(f"{where} must be a list")
+    try:
+        RuleMatcher(rules)
+    except ValueError as e:
+        raise ValueError(f"{where}: {e}") from e
+
+def reload_config():
+    """
+    Re-read config.json for a running app. CONFIG is updated in place, so later
+    save_config calls keep the edits; the module constants keep their startup values.
+    Raises ValueError (or OSError) and leaves CONFIG untouched if the file is invalid.
+    """
+    try:
+        config = validate_config(load_config())
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid JSON: {e}") from e
+    CONFIG.clear()
+    CONFIG.update(config)
+    return CONFIG
+
 CONFIG = load_config()
 WATCH_DIR = CONFIG.get("watch_directory", "")
+WATCH_ROOTS = CONFIG.get("watch_directories", [])
 FILE_CATEGORIES = CONFIG.get("categories", {})
+MATCH_RULES = CONFIG.get("rules", [])
 HANDLE_DUPLICATES = CONFIG.get("handle_duplicates", True)
+OBSERVER_BACKEND = CONFIG.get("observer_backend", "native")
+POLLING_INTERVAL = CONFIG.get("polling_interval", 1.0)
+BULK_WORKERS = CONFIG.get("bulk_workers", 4)
+STABILITY_INTERVAL = CONFIG.get("stability_interval", 0.5)
+MOVE_WORKERS = CONFIG.get("move_workers", 2)
+QUEUE_SIZE = CONFIG.get("queue_size", 10000)
+EVENT_DEBOUNCE = CONFIG.get("event_debounce", 0.2)
+CONTENT_DEDUP = CONFIG.get("content_dedup", "off")
+HASH_CACHE_PATH = CONFIG.get("hash_cache") or os.path.join(PROJECT_ROOT, "hash_cache.db")
+LOG_MAX_LINES = CONFIG.get("log_max_lines", 1000)
+LOG_FILE = CONFIG.get("log_file", "")
+RECURSIVE = CONFIG.get("recursive", False)
+MAX_DEPTH = CONFIG.get("max_depth", 10)
+EXCLUDE_DIRS = CONFIG.get("exclude", [])
+FSYNC_COPIES = CONFIG.get("fsync_copies", False)
+JOURNAL_ENABLED = CONFIG.get("journal", True)
+JOURNAL_PATH = CONFIG.get("journal_file") or os.path.join(PROJECT_ROOT, "moves.journal")
+JOURNAL_COMMIT_INTERVAL = CONFIG.get("journal_commit_interval", 0.2)
+METRICS_FILE = CONFIG.get("metrics_file", "")
+METRICS_INTERVAL = CONFIG.get("metrics_interval", 10)
+SNIFF_CONTENT = CONFIG.get("sniff_content", False)
+SNIFF_BYTES = CONFIG.get("sniff_bytes", 4096)
+RELOAD_CONFIG = CONFIG.get("reload_config", True)
+RELOAD_INTERVAL = CONFIG.get("reload_interval", 1.0)
+MOVE_BANDWIDTH = CONFIG.get("move_bandwidth", 0)
+MOVE_IOPS = CONFIG.get("move_iops", 0)
+DEVICE_CONCURRENCY = CONFIG.get("device_concurrency", 0)
+SMALL_FILE_BYTES = CONFIG.get("small_file_bytes", 0)
+LARGE_FILE_WORKERS = CONFIG.get("large_file_workers", 1)
+RESORT_ON_CHANGE = CONFIG.get("resort_on_change", False)
+APPLIED_RULES_PATH = CONFIG.get("applied_rules_file") or os.path.join(PROJECT_ROOT, "applied_rules.json")
+ENTRY_INDEX_ENABLED = CONFIG.get("entry_index", True)
+ENTRY_INDEX_PATH = CONFIG.get("entry_index_file") or os.path.join(PROJECT_ROOT, "entries.db")
 
 def save_config(config_dict):
     with open(CONFIG_PATH, "w") as f:
@@ -0,0 +1,65 @@
+import os
+import threading
+
+from core.config import CONFIG_PATH, RELOAD_INTERVAL, reload_config
+
+
+class ConfigWatcher:
+    """
+    Polls config.json and hands each valid new version to `on_change(config)`
+    once it has stopped changing.
+    A stat every `interval` seconds is enough here and, unlike a directory
+    watch, survives editors that save by writing a new file and renaming it.
+    Invalid files are reported through `log` and ignored until they change again.
+    """
+
+    def __init__(self, on_change, interval=RELOAD_INTERVAL, log=None):
+        self.on_change = on_change
+        self.interval = interval
+        self.log = log
+        self._stopped = threading.Event()
+        self._thread = None
+        self._seen = self._signature()
+        self._candidate = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="autosort-config", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _signature(self):
+        try:
+            st = os.stat(CONFIG_PATH)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns, st.st_ino
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            signature = self._signature()
+            if signature is None or signature == self._seen:
+                continue
+            # Wait until the file looks the same twice in a row, so a save
+            # still in progress is not read half-written
+            if signature != self._candidate:
+                self._candidate = signature
+                continue
+            self._seen = signature
+            try:
+                config = reload_config()
+                self.on_change(config)
+            except (OSError, ValueError) as e:
+                self._log(f"config.json not reloaded, keeping the current rules: {e}", "error")
+            except Exception as e:
+                # Anything else must not end the thread, or later edits would never load
+                self._log(f"config.json not reloaded, keeping the current rules: "
+                          f"{type(e).__name__}: {e}", "error")
+
+    def _log(self, message, message_type):
+        if self.log:
+            self.log(message, message_type)
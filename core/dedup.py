@@ -0,0 +1,170 @@
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+
+from core.config import CONTENT_DEDUP, HASH_CACHE_PATH
+
+DEDUP_MODES = ("off", "skip", "hardlink", "quarantine")
+QUARANTINE_DIR = "Duplicates"
+PARTIAL_BYTES = 64 * 1024
+CHUNK_BYTES = 1024 * 1024
+LOCK_STRIPES = 64
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def default_hash_cache():
+    """The process-wide hash cache, shared by every deduper."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = HashCache()
+            atexit.register(_shared_cache.close)
+        return _shared_cache
+
+
+class HashCache:
+    """
+    On-disk cache of file hashes keyed by (device, inode, size, mtime).
+    A rename keeps all four, so files moved by the organizer stay cached.
+    """
+
+    def __init__(self, path=HASH_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS hashes ("
+                "dev INTEGER, ino INTEGER, size INTEGER, mtime INTEGER, "
+                "partial TEXT, full TEXT, PRIMARY KEY (dev, ino, size, mtime))"
+            )
+
+    @staticmethod
+    def _key(st):
+        return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+    def get(self, st):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT partial, full FROM hashes WHERE dev=? AND ino=? AND size=? AND mtime=?",
+                self._key(st),
+            ).fetchone()
+        return row if row else (None, None)
+
+    def put(self, st, partial, full=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+                self._key(st) + (partial, full),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ContentDeduper:
+    """
+    Finds a byte-identical copy of a file in its destination folder.
+    Candidates are narrowed by size, then by a hash of the first and last
+    64 KB, and only then compared by a full streaming hash.
+    """
+
+    def __init__(self, mode=CONTENT_DEDUP, cache=None):
+        if mode not in DEDUP_MODES:
+            raise ValueError(f"Unknown content_dedup mode: {mode}")
+        self.mode = mode
+        self.cache = cache if cache is not None else default_hash_cache()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    def guard(self, destination_dir, size):
+        """
+        Lock held from find_duplicate() until the file is recorded, so two
+        identical files moved at the same time cannot both look unique.
+        """
+        return self._stripes[hash((destination_dir, size)) % LOCK_STRIPES]
+
+    def _folder_sizes(self, directory):
+        with self._lock:
+            sizes = self._sizes.get(directory)
+            if sizes is None:
+                sizes = {}
+                try:
+                    with os.scandir(directory) as entries:
+                        for entry in entries:
+                            if entry.is_file(follow_symlinks=False):
+                                sizes.setdefault(entry.stat().st_size, []).append(entry.path)
+                except OSError:
+                    pass
+                self._sizes[directory] = sizes
+            return sizes
+
+    def record(self, path, size):
+        """Register a file the organizer just placed in its folder."""
+        sizes = self._folder_sizes(os.path.dirname(path))
+        with self._lock:
+            sizes.setdefault(size, []).append(path)
+
+    def find_duplicate(self, file_path, destination_dir, st=None):
+        st = st or os.stat(file_path)
+        if st.st_size == 0:
+            return None
+
+        sizes = self._folder_sizes(destination_dir)
+        with self._lock:
+            candidates = [p for p in sizes.get(st.st_size, ()) if p != file_path]
+        if not candidates:
+            return None
+
+        partial = None
+        for candidate in candidates:
+            try:
+                cst = os.stat(candidate)
+            except OSError:
+                continue
+            if cst.st_size != st.st_size:
+                continue
+            if (cst.st_dev, cst.st_ino) == (st.st_dev, st.st_ino):
+                return candidate
+            if partial is None:
+                partial = self._partial_hash(file_path, st)
+            if self._partial_hash(candidate, cst) != partial:
+                continue
+            if self._full_hash(candidate, cst) == self._full_hash(file_path, st):
+                return candidate
+        return None
+
+    def _partial_hash(self, path, st):
+        cached, _ = self.cache.get(st)
+        if cached:
+            return cached
+        digest = hashlib.blake2b()
+        with open(path, "rb") as f:
+            digest.update(f.read(PARTIAL_BYTES))
+            if st.st_size > 2 * PARTIAL_BYTES:
+                f.seek(-PARTIAL_BYTES, os.SEEK_END)
+                digest.update(f.read(PARTIAL_BYTES))
+            elif st.st_size > PARTIAL_BYTES:
+                digest.update(f.read())
+        partial = digest.hexdigest()
+        # Small files are read whole, so the partial hash is also the full one
+        self.cache.put(st, partial, partial if st.st_size <= 2 * PARTIAL_BYTES else None)
+        return partial
+
+    def _full_hash(self, path, st):
+        partial, cached = self.cache.get(st)
+        if cached:
+            return cached
+        digest = hashlib.blake2b()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+                digest.update(chunk)
+        full = digest.hexdigest()
+        self.cache.put(st, partial or self._partial_hash(path, st), full)
+        return full
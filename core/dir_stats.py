@@ -0,0 +1,171 @@
+import os
+import threading
+
+from core.dedup import QUARANTINE_DIR
+
+UNSORTED = "Unsorted"
+
+
+class DirectoryStats:
+    """
+    File counts and byte totals for a folder, per top-level category folder
+    plus UNSORTED for files still waiting at the top of the folder.
+    One scandir pass runs on a background thread; after that the totals are
+    kept current from organizer moves and watcher events, never by rescanning.
+    snapshot() only reads memory, so the UI thread can call it freely.
+    """
+
+    def __init__(self, directory, rules):
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._reset(directory, rules)
+
+    def _reset(self, directory, rules):
+        self.directory = os.path.abspath(directory)
+        self.category_dirs = rules.category_dirs | {QUARANTINE_DIR}
+        self.ready = False
+        self.missing = False
+        self._unsorted = {}   # path → size; needed to subtract files that leave
+        self._unsorted_bytes = 0
+        self._totals = {}     # category → [files, bytes]
+        # Category folders the scan has listed but not counted yet (None: not
+        # listed yet); moves into them are left for the scan to count
+        self._pending = None
+        self._generation += 1
+
+    def start(self):
+        with self._lock:
+            generation = self._generation
+        threading.Thread(target=self._scan, args=(generation,), name="autosort-dir-stats", daemon=True).start()
+
+    def rescan(self, directory, rules):
+        """
+        Count `directory` again from scratch. The instance stays the same, so
+        organizers already holding it keep reporting their moves to it.
+        """
+        with self._lock:
+            self._reset(directory, rules)
+        self.start()
+
+    def snapshot(self):
+        """{category: (files, bytes)}, UNSORTED included once the scan has finished."""
+        with self._lock:
+            totals = {category: tuple(value) for category, value in self._totals.items() if value[0]}
+            totals[UNSORTED] = (len(self._unsorted), self._unsorted_bytes)
+        return totals
+
+    def _scan(self, generation):
+        # A rescan started since makes this one stale; it then stops touching the totals
+        try:
+            with os.scandir(self.directory) as it:
+                entries = list(it)
+        except OSError:
+            with self._lock:
+                if generation == self._generation:
+                    self.missing = True
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._pending = {entry.name for entry in entries if entry.name in self.category_dirs}
+
+        for entry in entries:
+            try:
+                if entry.is_file():
+                    size = entry.stat().st_size
+                    with self._lock:
+                        if generation != self._generation:
+                            return
+                        if entry.path not in self._unsorted:
+                            self._set_unsorted(entry.path, size)
+                elif entry.is_dir() and entry.name in self.category_dirs:
+                    files, size = _tree_totals(entry.path)
+                    with self._lock:
+                        if generation != self._generation:
+                            return
+                        self._add(entry.name, files, size)
+                        self._pending.discard(entry.name)
+            except OSError:
+                continue
+        with self._lock:
+            if generation == self._generation:
+                self._pending = set()
+                self.ready = True
+
+    def _add(self, category, files, size):
+        totals = self._totals.setdefault(category, [0, 0])
+        totals[0] += files
+        totals[1] += size
+
+    def _set_unsorted(self, path, size):
+        self._unsorted_bytes += size - self._unsorted.get(path, 0)
+        self._unsorted[path] = size
+
+    def _pop_unsorted(self, path):
+        size = self._unsorted.pop(path, None)
+        if size is not None:
+            self._unsorted_bytes -= size
+        return size
+
+    def _category(self, path):
+        """The top-level category folder `path` lies in, "" for the folder itself, or None."""
+        relative = os.path.relpath(os.path.dirname(path), self.directory)
+        if relative == os.curdir:
+            return ""
+        first = relative.split(os.sep, 1)[0]
+        return first if first in self.category_dirs else None
+
+    def file_added(self, path):
+        """A watcher event: a file appeared at the top of the folder."""
+        # Category folders only change through file_moved, so the watcher
+        # event for the organizer's own move is not counted twice
+        if self._category(path) != "":
+            return
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return
+        with self._lock:
+            self._set_unsorted(path, size)
+
+    def file_removed(self, path):
+        with self._lock:
+            self._pop_unsorted(path)
+
+    def file_moved(self, source, destination, size=None):
+        """An organizer move: the file leaves UNSORTED and joins its category."""
+        with self._lock:
+            known = self._pop_unsorted(source)
+        category = self._category(destination)
+        if not category:
+            return
+        if size is None:
+            # Stat again: a file the watcher saw being created may have grown since
+            try:
+                size = os.stat(destination).st_size
+            except OSError:
+                size = known or 0
+        with self._lock:
+            if self._pending is None or category in self._pending:
+                return  # the scan has yet to reach this folder and will count the file
+            self._add(category, 1, size)
+
+
+def _tree_totals(directory):
+    files = size = 0
+    stack = [directory]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            files += 1
+                            size += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return files, size
@@ -0,0 +1,126 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+
+from core.config import ENTRY_INDEX_ENABLED, ENTRY_INDEX_PATH
+from core.metrics import METRICS
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def default_entry_index():
+    """The process-wide entry index, or None when it is turned off."""
+    global _shared
+    if not ENTRY_INDEX_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = EntryIndex()
+            atexit.register(_shared.close)
+        return _shared
+
+
+class EntryIndex:
+    """
+    On-disk record of the files the organizer looked at and left in place
+    (skipped duplicates, files already where they belong), keyed by watched
+    folder and relative name with the inode and mtime seen at the time.
+    On startup one walk of the folder is diffed against it, so only new or
+    changed files are organized again.
+    Every row also stores a fingerprint of the settings that led to the
+    decision and, for a skipped duplicate, the original it matched; a row is
+    only trusted while both still hold.
+    Rows are written in one transaction per `batch_size` rows or
+    `commit_interval` seconds; losing the last few only means those files
+    are looked at again.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, path=ENTRY_INDEX_PATH, batch_size=500, commit_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self._lock = threading.Lock()
+        self._pending = []
+        self._committed = time.monotonic()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            # Rows written before the settings were recorded cannot be trusted
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS entries")
+                self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "root TEXT, name TEXT, ino INTEGER, mtime INTEGER, decision TEXT, "
+                "settings TEXT, original TEXT, PRIMARY KEY (root, name))"
+            )
+
+    def remember(self, root, path, decision, settings, original=None):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        with self._lock:
+            self._pending.append(
+                (root, os.path.relpath(path, root), st.st_ino, st.st_mtime_ns, decision, settings, original))
+            if len(self._pending) >= self.batch_size or \
+                    time.monotonic() - self._committed >= self.commit_interval:
+                self._commit()
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def _commit(self):
+        # Caller holds self._lock
+        self._committed = time.monotonic()
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def changed(self, root, entries, settings):
+        """
+        Yield the DirEntry objects from `entries` that are new or changed since
+        they were remembered, or were remembered under other `settings`. The
+        inode is compared first (free from scandir), so only files that look
+        unchanged cost a stat. Once the walk finishes, rows for files that are
+        gone or for other settings are dropped.
+        """
+        with self._lock:
+            self._commit()
+            rows = {name: (ino, mtime, original) for name, ino, mtime, original in self._conn.execute(
+                "SELECT name, ino, mtime, original FROM entries WHERE root=? AND settings=?",
+                (root, settings))}
+
+        prefix = len(os.path.join(root, ""))
+        seen = set()
+        for entry in entries:
+            name = entry.path[prefix:]
+            row = rows.get(name)
+            if row is not None:
+                seen.add(name)
+                try:
+                    if entry.inode() == row[0] and entry.stat().st_mtime_ns == row[1] \
+                            and (row[2] is None or os.path.lexists(row[2])):
+                        METRICS.incr("files_unchanged")
+                        continue
+                except OSError:
+                    continue
+            yield entry
+
+        gone = [(root, name) for name in rows if name not in seen]
+        with self._lock, self._conn:
+            if gone:
+                self._conn.executemany("DELETE FROM entries WHERE root=? AND name=?", gone)
+            self._conn.execute("DELETE FROM entries WHERE root=? AND settings<>?", (root, settings))
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._conn.close()
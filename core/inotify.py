@@ -0,0 +1,233 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+
+from watchdog.events import (DirCreatedEvent, DirDeletedEvent, DirMovedEvent, FileCreatedEvent,
+                             FileDeletedEvent, FileMovedEvent)
+
+from core.metrics import METRICS
+
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+READ_SIZE = 64 * 1024
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") else None
+
+
+_libc = _load_libc()
+
+
+def available():
+    """Whether this platform offers inotify (Linux with a usable libc)."""
+    return _libc is not None
+
+
+def _os_error(path=None):
+    code = ctypes.get_errno()
+    return OSError(code, os.strerror(code), path)
+
+
+class SharedInotifyObserver(threading.Thread):
+    """
+    One inotify instance and one reader thread for every watched folder.
+    watchdog's inotify observer runs an emitter and a reader thread per
+    scheduled path, so dozens of roots meant dozens of threads; here each
+    root (and, when recursive, each folder below it) costs one kernel watch.
+    Events are delivered to the handler like watchdog's: created, deleted
+    and moved, for files and folders. When recursive, only subfolders for
+    which `watch_filter(path)` is true get a watch (and are descended into),
+    so pruned, excluded and too-deep folders cost nothing. Errors the handler
+    lets escape are counted and reported through `log`.
+    """
+
+    def __init__(self, watch_filter=None, log=None):
+        super().__init__(name="autosort-inotify", daemon=True)
+        fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise _os_error()
+        self._fd = fd
+        self._wake_read, self._wake_write = os.pipe()
+        self._fds = (fd, self._wake_read, self._wake_write)
+        self._handler = None
+        self._watch_filter = watch_filter
+        self._log = log
+        self._recursive = False
+        self._paths = {}    # watch descriptor → folder
+        self._watches = {}  # folder → watch descriptor
+
+    def schedule(self, handler, path, recursive=False):
+        self._handler = handler
+        self._recursive = self._recursive or recursive
+        path = os.path.abspath(path)
+        self._add_watch(path)
+        if recursive:
+            for directory, subdirs, _ in os.walk(path):
+                subdirs[:] = [name for name in subdirs if self._wanted(os.path.join(directory, name))]
+                for name in subdirs:
+                    self._add_watch(os.path.join(directory, name))
+
+    def unschedule_all(self):
+        for wd in list(self._paths):
+            _libc.inotify_rm_watch(self._fd, wd)
+        self._paths.clear()
+        self._watches.clear()
+        if not self.is_alive():
+            self._close()  # never started: nothing else will release the descriptors
+
+    def stop(self):
+        if self._fds:
+            os.write(self._wake_write, b"\0")
+
+    def run(self):
+        try:
+            while True:
+                readable, _, _ = select.select([self._fd, self._wake_read], [], [])
+                if self._wake_read in readable:
+                    return
+                self._dispatch_all(self._read_events())
+        finally:
+            self._close()
+
+    def _close(self):
+        fds, self._fds = self._fds, ()
+        for fd in fds:
+            os.close(fd)
+
+    def _wanted(self, directory):
+        return self._watch_filter is None or self._watch_filter(directory)
+
+    def _add_watch(self, path):
+        wd = _libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise _os_error(path)
+        self._paths[wd] = path
+        self._watches[path] = wd
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, READ_SIZE)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((wd, mask, cookie, name))
+        return events
+
+    def _dispatch_all(self, events):
+        # The two halves of a rename arrive together; a half without its
+        # partner crossed the edge of the watched folders
+        moved_from = {}
+        for wd, mask, cookie, name in events:
+            if mask & IN_IGNORED:
+                path = self._paths.pop(wd, None)
+                if path is not None and self._watches.get(path) == wd:
+                    del self._watches[path]
+                continue
+            directory = self._paths.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            is_dir = bool(mask & IN_ISDIR)
+
+            if mask & IN_MOVED_FROM:
+                moved_from[cookie] = (path, is_dir)
+            elif mask & IN_MOVED_TO:
+                source = moved_from.pop(cookie, None)
+                if source is None:
+                    self._created(path, is_dir)
+                else:
+                    self._moved(source[0], path, is_dir)
+            elif mask & IN_CREATE:
+                self._created(path, is_dir)
+            elif mask & IN_DELETE:
+                self._dispatch(DirDeletedEvent(path) if is_dir else FileDeletedEvent(path))
+
+        for path, is_dir in moved_from.values():
+            if is_dir:
+                self._forget_tree(path)
+            self._dispatch(DirDeletedEvent(path) if is_dir else FileDeletedEvent(path))
+
+    def _created(self, path, is_dir):
+        if not is_dir:
+            self._dispatch(FileCreatedEvent(path))
+            return
+        self._dispatch(DirCreatedEvent(path))
+        if self._recursive and self._wanted(path):
+            self._watch_tree(path)
+
+    def _watch_tree(self, path):
+        # Files can land in a new folder before its watch exists; report them too
+        for directory, subdirs, files in os.walk(path):
+            try:
+                self._add_watch(directory)
+            except OSError:
+                subdirs[:] = []
+                continue
+            subdirs[:] = [name for name in subdirs if self._wanted(os.path.join(directory, name))]
+            for name in subdirs:
+                self._dispatch(DirCreatedEvent(os.path.join(directory, name)))
+            for name in files:
+                self._dispatch(FileCreatedEvent(os.path.join(directory, name)))
+
+    def _moved(self, source, destination, is_dir):
+        if not is_dir:
+            self._dispatch(FileMovedEvent(source, destination))
+            return
+        # Watches follow the folder; only the paths they are known by change
+        prefix = os.path.join(source, "")
+        for wd, path in list(self._paths.items()):
+            if path == source or path.startswith(prefix):
+                new_path = destination + path[len(source):]
+                self._paths[wd] = new_path
+                self._watches.pop(path, None)
+                self._watches[new_path] = wd
+        if self._recursive:
+            # Renamed into or out of scope, e.g. to the name of a category folder
+            if not self._wanted(destination):
+                self._forget_tree(destination)
+            elif destination not in self._watches:
+                self._watch_tree(destination)
+        self._dispatch(DirMovedEvent(source, destination))
+
+    def _forget_tree(self, directory):
+        prefix = os.path.join(directory, "")
+        for path, wd in list(self._watches.items()):
+            if path == directory or path.startswith(prefix):
+                _libc.inotify_rm_watch(self._fd, wd)
+
+    def _dispatch(self, event):
+        try:
+            self._handler.dispatch(event)
+        except Exception as e:
+            # One bad event must not stop the reader thread
+            METRICS.incr("errors")
+            if self._log:
+                self._log(f"Error handling {event.src_path}: {type(e).__name__}: {e}", "error")
+
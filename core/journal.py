@@ -0,0 +1,295 @@
+import json
+import os
+import threading
+import time
+
+from core.config import JOURNAL_ENABLED, JOURNAL_PATH, JOURNAL_COMMIT_INTERVAL
+from core.mover import move_file
+
+INDEXED_OPS = ("run", "walked", "end")
+COUNTED_OPS = {"move": "moves", "undo": "undos"}
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def default_journal():
+    """The process-wide journal, or None when journaling is turned off."""
+    global _shared
+    if not JOURNAL_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = MoveJournal()
+        return _shared
+
+
+class MoveJournal:
+    """
+    Append-only record of what the organizer planned and moved, one JSON
+    array per line:
+        ["run", run_id, time, directory, kind]
+        ["plan", run_id, source]
+        ["walked", run_id]
+        ["move", run_id, time, source, destination]
+        ["undo", run_id, time, source, destination]
+        ["end", run_id, time]
+    Records are written and fsynced in groups every `commit_interval`
+    seconds by a background thread, so callers never wait on the disk.
+
+    A small index next to it (`<path>.index`) repeats the run, walked and
+    end records, the run's byte offset in the journal and its move and undo
+    counts per commit:
+        ["run", run_id, time, directory, kind, offset]
+        ["moves", run_id, count]
+        ["undos", run_id, count]
+    Listing runs and finding an unfinished one read only the index, and a
+    run's own records are read from its offset, so neither cost grows with
+    the moves of older runs. A journal without an index (from an older
+    version) is indexed once, the first time it is needed.
+    """
+
+    def __init__(self, path=JOURNAL_PATH, commit_interval=JOURNAL_COMMIT_INTERVAL):
+        self.path = path
+        self.index_path = f"{path}.index"
+        self.commit_interval = commit_interval
+        self._file = open(path, "a", encoding="utf-8")
+        self._index_file = None
+        self._buffer = []
+        self._index_buffer = []
+        self._counts = {}  # ("moves" or "undos", run_id) → records since the last commit
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._last_run = 0
+        self._offsets = {}
+        self._thread = threading.Thread(target=self._commit_loop, name="autosort-journal", daemon=True)
+        self._thread.start()
+
+    def _append(self, record, offset=None):
+        line = _line(record)
+        op = record[0]
+        with self._cond:
+            self._buffer.append(line)
+            if op in COUNTED_OPS:
+                key = (COUNTED_OPS[op], record[1])
+                self._counts[key] = self._counts.get(key, 0) + 1
+            elif op in INDEXED_OPS:
+                self._index_buffer.append(record + [offset] if op == "run" else record)
+
+    def _commit_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait(self.commit_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def flush(self):
+        with self._cond:
+            lines, self._buffer = self._buffer, []
+            indexed, self._index_buffer = self._index_buffer, []
+            counts, self._counts = self._counts, {}
+        if not lines:
+            return
+        with self._write_lock:
+            # Index the journal as it was before these lines, if that never happened
+            self._open_index()
+            self._file.write("".join(lines))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            # The index never gets ahead of the journal it describes
+            indexed.extend([op, run_id, count] for (op, run_id), count in counts.items())
+            self._index_file.write("".join(_line(record) for record in indexed))
+            self._index_file.flush()
+            os.fsync(self._index_file.fileno())
+
+    def _open_index(self):
+        if self._index_file is not None:
+            return
+        if os.path.getsize(self.path) == 0:
+            # A new journal: an index left over from a deleted one describes nothing
+            self._index_file = open(self.index_path, "w", encoding="utf-8")
+            return
+        if not os.path.exists(self.index_path):
+            temp_path = f"{self.index_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.writelines(_line(record) for record in self._scan_runs())
+            os.replace(temp_path, self.index_path)
+        self._index_file = open(self.index_path, "a", encoding="utf-8")
+
+    def _scan_runs(self):
+        """The index records for the whole journal, from one pass over it."""
+        counts = {}
+        offset = 0
+        with open(self.path, "rb") as f:
+            for raw in f:
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    record = None
+                if record:
+                    op = record[0]
+                    if op in COUNTED_OPS:
+                        key = (COUNTED_OPS[op], record[1])
+                        counts[key] = counts.get(key, 0) + 1
+                    elif op == "run":
+                        yield record + [offset]
+                    elif op in INDEXED_OPS:
+                        yield record
+                offset += len(raw)
+        for (op, run_id), count in counts.items():
+            yield [op, run_id, count]
+
+    def _index_records(self):
+        self.flush()
+        with self._write_lock:
+            self._open_index()
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+                if record[0] == "run":
+                    self._offsets.setdefault(record[1], record[5])
+                yield record
+
+    def _run_offset(self, run_id):
+        if run_id not in self._offsets:
+            for _ in self._index_records():
+                pass
+        return self._offsets.get(run_id, 0)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self._file.close()
+        if self._index_file is not None:
+            self._index_file.close()
+
+    def begin(self, directory, kind="bulk"):
+        with self._cond:
+            run_id = max(int(time.time() * 1000), self._last_run + 1)
+            self._last_run = run_id
+        self.flush()
+        with self._write_lock:
+            offset = self._offsets[run_id] = self._file.tell()
+        self._append(["run", run_id, time.time(), directory, kind], offset)
+        return run_id
+
+    def plan(self, run_id, source):
+        self._append(["plan", run_id, source])
+
+    def walked(self, run_id):
+        self._append(["walked", run_id])
+        self.flush()
+
+    def moved(self, run_id, source, destination):
+        self._append(["move", run_id, time.time(), source, destination])
+
+    def end(self, run_id):
+        self._append(["end", run_id, time.time()])
+        self.flush()
+
+    def records(self, offset=0):
+        self.flush()
+        with open(self.path, "r", encoding="utf-8") as f:
+            f.seek(offset)
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+
+    def unfinished_run(self, directory):
+        """
+        The id of the latest bulk run on `directory` that finished listing
+        its files but never finished moving them, or None.
+        """
+        runs = {}
+        for record in self._index_records():
+            op, run_id = record[0], record[1]
+            if op == "run" and record[3] == directory and record[4] == "bulk":
+                runs[run_id] = False
+            elif op == "walked" and run_id in runs:
+                runs[run_id] = True
+            elif op == "end":
+                runs.pop(run_id, None)
+        walked = [run_id for run_id, done in runs.items() if done]
+        return max(walked) if walked else None
+
+    def planned(self, run_id):
+        """Stream the source paths planned by a run, in planning order."""
+        for record in self.records(self._run_offset(run_id)):
+            if record[0] == "plan" and record[1] == run_id:
+                yield record[2]
+
+    def runs(self):
+        """Summaries of every run: {id, time, directory, kind, moves, undone, finished}."""
+        runs = {}
+        for record in self._index_records():
+            op, run_id = record[0], record[1]
+            if op == "run":
+                runs[run_id] = {"id": run_id, "time": record[2], "directory": record[3],
+                                "kind": record[4], "moves": 0, "undone": 0, "finished": False}
+            elif op == "moves" and run_id in runs:
+                runs[run_id]["moves"] += record[2]
+            elif op == "undos" and run_id in runs:
+                runs[run_id]["undone"] += record[2]
+            elif op == "end" and run_id in runs:
+                runs[run_id]["finished"] = True
+        return list(runs.values())
+
+    def undo(self, run_id=None, since=None, until=None, log=None):
+        """
+        Move files back to where they came from, newest first.
+        Selects one run, or every move between `since` and `until`
+        (epoch seconds). Moves already undone are skipped. Returns the count.
+        """
+        moves = []
+        undone = set()
+        # A run's moves and their undos all come after its first record
+        for record in self.records(self._run_offset(run_id) if run_id is not None else 0):
+            op = record[0]
+            if op == "undo":
+                undone.add((record[3], record[4]))
+                continue
+            if op != "move":
+                continue
+            if run_id is not None and record[1] != run_id:
+                continue
+            if since is not None and record[2] < since:
+                continue
+            if until is not None and record[2] > until:
+                continue
+            moves.append((record[1], record[3], record[4]))
+
+        restored = 0
+        created = set()
+        for move_run, source, destination in reversed(moves):
+            if (source, destination) in undone:
+                continue
+            if not os.path.isfile(destination) or os.path.lexists(source):
+                continue
+            try:
+                directory = os.path.dirname(source)
+                if directory not in created:
+                    os.makedirs(directory, exist_ok=True)
+                    created.add(directory)
+                move_file(destination, source)
+            except OSError as e:
+                if log:
+                    log(f"Could not restore {os.path.basename(source)}: {e}", "error")
+                continue
+            self._append(["undo", move_run, time.time(), source, destination])
+            restored += 1
+        self.flush()
+        return restored
+
+
+def _line(record):
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
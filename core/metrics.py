@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+
+from core.config import METRICS_FILE, METRICS_INTERVAL
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """
+    Process-wide counters, per-stage timers and gauges for the organizer.
+    Example:
+        with METRICS.timer("move"):
+            move_file(src, dst)
+        METRICS.incr("files_moved")
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = {}
+        self._values = {}
+        self._gauges = {}
+        self.started = time.time()
+
+    def timer(self, stage):
+        return _Timer(self, stage)
+
+    def record(self, stage, seconds):
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                self._stages[stage] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                if seconds > stats[2]:
+                    stats[2] = seconds
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        """Keep the latest and the largest value seen (e.g. event lag)."""
+        with self._lock:
+            _, peak = self._values.get(name, (0, value))
+            self._values[name] = (value, max(peak, value))
+
+    def gauge(self, name, read):
+        """Register a callable read at snapshot time (e.g. queue depth)."""
+        with self._lock:
+            self._gauges[name] = read
+
+    def remove_gauge(self, name):
+        with self._lock:
+            self._gauges.pop(name, None)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+            self._values.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            stages = {
+                stage: {"calls": calls, "seconds": total, "max_seconds": peak,
+                        "avg_ms": total / calls * 1000 if calls else 0.0}
+                for stage, (calls, total, peak) in self._stages.items()
+            }
+            counters = dict(self._counters)
+            values = {name: {"last": last, "max": peak} for name, (last, peak) in self._values.items()}
+            gauges = list(self._gauges.items())
+
+        readings = {}
+        for name, read in gauges:
+            try:
+                readings[name] = read()
+            except Exception:
+                continue
+        return {"uptime_seconds": time.time() - self.started, "stages": stages,
+                "counters": counters, "values": values, "gauges": readings}
+
+    def to_prometheus(self):
+        snap = self.snapshot()
+        lines = [
+            "# TYPE autosort_stage_seconds_total counter",
+            *(f'autosort_stage_seconds_total{{stage="{s}"}} {v["seconds"]:.6f}' for s, v in snap["stages"].items()),
+            "# TYPE autosort_stage_calls_total counter",
+            *(f'autosort_stage_calls_total{{stage="{s}"}} {v["calls"]}' for s, v in snap["stages"].items()),
+            "# TYPE autosort_stage_seconds_max gauge",
+            *(f'autosort_stage_seconds_max{{stage="{s}"}} {v["max_seconds"]:.6f}' for s, v in snap["stages"].items()),
+        ]
+        for name, value in sorted(snap["counters"].items()):
+            lines += [f"# TYPE autosort_{name}_total counter", f"autosort_{name}_total {value}"]
+        for name, value in sorted(snap["values"].items()):
+            lines += [f"# TYPE autosort_{name} gauge", f"autosort_{name} {value['last']:.6f}",
+                      f"# TYPE autosort_{name}_max gauge", f"autosort_{name}_max {value['max']:.6f}"]
+        for name, value in sorted(snap["gauges"].items()):
+            lines += [f"# TYPE autosort_{name} gauge", f"autosort_{name} {value}"]
+        lines += ["# TYPE autosort_uptime_seconds gauge", f"autosort_uptime_seconds {snap['uptime_seconds']:.0f}"]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Write the text exposition format atomically (for node_exporter's textfile collector)."""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(temp_path, path)
+
+
+METRICS = Metrics()
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def start_exporter(path=METRICS_FILE, interval=METRICS_INTERVAL):
+    """Rewrite the Prometheus file every `interval` seconds; no-op without a path."""
+    global _exporter
+    if not path:
+        return
+    with _exporter_lock:
+        if _exporter is not None:
+            return
+
+        def export():
+            while True:
+                try:
+                    METRICS.write_prometheus(path)
+                except OSError:
+                    pass
+                time.sleep(interval)
+
+        _exporter = threading.Thread(target=export, name="autosort-metrics", daemon=True)
+        _exporter.start()
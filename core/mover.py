@@ -0,0 +1,121 @@
+import errno
+import os
+import shutil
+import sys
+import time
+from collections import namedtuple
+
+from core.config import FSYNC_COPIES
+
+KERNEL_CHUNK = 64 * 1024 * 1024
+BUFFER_CHUNK = 1024 * 1024
+THROTTLED_CHUNK = 4 * 1024 * 1024  # Bandwidth limits are applied at this granularity
+TEMP_SUFFIX = ".autosort-part"
+
+# Errors meaning "this copy method is not available here", not "the copy failed"
+UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+                      getattr(errno, "ENOTSUP", errno.EOPNOTSUPP), errno.EBADF}
+
+MoveResult = namedtuple("MoveResult", ["bytes", "seconds", "copied"])
+
+
+def _copy_file_range(src_fd, dst_fd, count, offset):
+    return os.copy_file_range(src_fd, dst_fd, count)
+
+
+def _sendfile(src_fd, dst_fd, count, offset):
+    return os.sendfile(dst_fd, src_fd, offset, count)
+
+
+def _read_write(src_fd, dst_fd, count, offset):
+    data = os.read(src_fd, min(count, BUFFER_CHUNK))
+    view = memoryview(data)
+    while view:
+        view = view[os.write(dst_fd, view):]
+    return len(data)
+
+
+COPIERS = []
+if hasattr(os, "copy_file_range"):
+    COPIERS.append(_copy_file_range)
+if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+    COPIERS.append(_sendfile)
+COPIERS.append(_read_write)
+
+
+def _copy_data(src_fd, dst_fd, size, throttle=None):
+    chunk = THROTTLED_CHUNK if throttle else KERNEL_CHUNK
+    for copier in COPIERS:
+        copied = 0
+        try:
+            while copied < size:
+                n = copier(src_fd, dst_fd, min(chunk, size - copied), copied)
+                if n == 0:
+                    break
+                copied += n
+                if throttle:
+                    throttle(n)
+            return copied
+        except OSError as e:
+            if copied or e.errno not in UNSUPPORTED_ERRNOS or copier is _read_write:
+                raise
+    return 0
+
+
+def _fsync_dir(directory):
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def copy_then_replace(source_path, destination_path, fsync=FSYNC_COPIES, throttle=None):
+    """
+    Copy `source_path` next to `destination_path` under a temporary name,
+    then rename it into place and delete the source. The data is copied by
+    the kernel where possible (copy_file_range, then sendfile). A failure
+    removes the temporary file, so no partial file is ever left behind.
+    `throttle(n)` is called after every chunk, e.g. to pace the copy.
+    """
+    directory, name = os.path.split(destination_path)
+    temp_path = os.path.join(directory, f".{name}{TEMP_SUFFIX}")
+    start = time.perf_counter()
+
+    try:
+        with open(source_path, "rb") as src, open(temp_path, "xb") as dst:
+            size = os.fstat(src.fileno()).st_size
+            copied = _copy_data(src.fileno(), dst.fileno(), size, throttle)
+            if fsync:
+                os.fsync(dst.fileno())
+        shutil.copystat(source_path, temp_path)
+        os.replace(temp_path, destination_path)
+        if fsync:
+            _fsync_dir(directory)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    os.remove(source_path)
+    return MoveResult(copied, time.perf_counter() - start, True)
+
+
+def move_file(source_path, destination_path, fsync=FSYNC_COPIES, throttle=None):
+    """
+    Move a file onto `destination_path`, replacing a claimed placeholder.
+    Same-device moves are a single atomic rename; cross-device moves go
+    through copy_then_replace().
+    """
+    start = time.perf_counter()
+    try:
+        os.replace(source_path, destination_path)
+        return MoveResult(0, time.perf_counter() - start, False)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    return copy_then_replace(source_path, destination_path, fsync, throttle)
@@ -0,0 +1,72 @@
+import errno
+
+from watchdog.observers.polling import PollingObserver
+
+from core import inotify
+from core.config import OBSERVER_BACKEND, POLLING_INTERVAL
+
+try:
+    from watchdog.observers import Observer as NativeObserver
+except ImportError:  # pragma: no cover - platform without a native backend
+    NativeObserver = None
+
+# Raised by inotify when fs.inotify.max_user_watches / max_user_instances run out
+WATCH_LIMIT_ERRNOS = {errno.ENOSPC, errno.EMFILE}
+
+
+def start_observer(handler, paths, recursive=False, backend=OBSERVER_BACKEND,
+                   polling_interval=POLLING_INTERVAL, log=None, watch_filter=None):
+    """
+    Schedule `handler` on `paths` (one folder or a list) and start a single observer.
+    The native backend is tried first unless polling is configured; polling
+    is used only when the native one cannot start. On Linux the native
+    backend is one shared inotify instance and reader thread for all paths,
+    which only watches the subfolders `watch_filter(path)` accepts.
+    Returns the running observer.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+
+    native = _native_observer_class()
+    if backend != "polling" and native is not None:
+        observer = None
+        try:
+            if native is inotify.SharedInotifyObserver:
+                observer = native(watch_filter, log)
+            else:
+                observer = native()
+            _schedule(observer, handler, paths, recursive)
+            observer.start()
+            _log(log, f"Using native observer ({type(observer).__name__})", "info")
+            return observer
+        except OSError as e:
+            if observer is not None:
+                observer.unschedule_all()
+            reason = "watch limit reached" if e.errno in WATCH_LIMIT_ERRNOS else str(e)
+            _log(log, f"Native observer unavailable ({reason}), falling back to polling", "warning")
+    elif backend != "polling":
+        _log(log, "Native observer not supported on this platform, falling back to polling", "warning")
+
+    observer = PollingObserver(timeout=polling_interval)
+    _schedule(observer, handler, paths, recursive)
+    observer.start()
+    _log(log, f"Using polling observer (every {polling_interval}s)", "info")
+    return observer
+
+
+def _native_observer_class():
+    if inotify.available():
+        return inotify.SharedInotifyObserver
+    if NativeObserver is not None and NativeObserver is not PollingObserver:
+        return NativeObserver
+    return None
+
+
+def _schedule(observer, handler, paths, recursive):
+    for path in paths:
+        observer.schedule(handler, path=path, recursive=recursive)
+
+
+def _log(log, message, message_type):
+    if log:
+        log(message, message_type)
@@ -1,153 +1,563 @@
+import hashlib
+import json
 import os
+import threading
 import time
-import shutil
-from watchdog.observers.polling import PollingObserver
 from watchdog.events import FileSystemEventHandler
 
-from core.config import WATCH_DIR, FILE_CATEGORIES, HANDLE_DUPLICATES
-from utils.file_utils import resolve_duplicate
+from core.config import (WATCH_DIR, FILE_CATEGORIES, MATCH_RULES, HANDLE_DUPLICATES, CONTENT_DEDUP,
+                         RECURSIVE, MAX_DEPTH, EXCLUDE_DIRS, SNIFF_CONTENT, RELOAD_CONFIG,
+                         ENTRY_INDEX_ENABLED, RESORT_ON_CHANGE)
+from core.bulk import BulkOrganizer
+from core.config_watcher import ConfigWatcher
+from core.dedup import ContentDeduper, QUARANTINE_DIR
+from core.entry_index import default_entry_index
+from core.journal import default_journal
+from core.metrics import METRICS, start_exporter
+from core.mover import move_file
+from core.observers import start_observer
+from core.planner import build_plan
+from core.resort import applied_folders, record_applied_rules, resort, rules_folders
+from core.scheduler import default_scheduler
+from core.rules import RuleIndex
+from core.sniff import ContentSniffer
+from core.stability import StabilityTracker
+from core.walker import compile_excludes, walk_entries, walk_files
+from core.work_queue import WorkQueue
+from utils.file_utils import NameIndex, format_size
 
 class DirOrganizer:
-    def __init__(self, watch_dir=WATCH_DIR, gui_app=None):
-        self.watch_dir = watch_dir
+    def __init__(self, watch_dir=WATCH_DIR, gui_app=None, rules=None, dedup_mode=CONTENT_DEDUP,
+                 recursive=RECURSIVE, max_depth=MAX_DEPTH, exclude=EXCLUDE_DIRS, journal=None,
+                 sniff_content=SNIFF_CONTENT, roots=(), dir_stats=None,
+                 entry_index=ENTRY_INDEX_ENABLED):
         self.gui_app = gui_app
-        self.observer = PollingObserver()
-        self.handler = DirOrganizerHandler(self.watch_dir, self.gui_app)
-
-    def start_gui(self):
+        # (default RuleIndex, {watched folder: RuleIndex}) in one attribute, so a
+        # config reload replaces both with a single assignment
+        self._rule_set = (rules if rules is not None else RuleIndex(FILE_CATEGORIES, MATCH_RULES), {})
+        self._root_specs = {}
+        for root in ([watch_dir] if watch_dir else []) + list(roots):
+            self.add_root(root)
+        self.watch_dir = next(iter(self.roots), watch_dir)
+        self.handle_duplicates = HANDLE_DUPLICATES
+        self.dir_stats = dir_stats
+        self.entry_index = default_entry_index() if entry_index else None
+        self._settings_keys = {}
+        self.scheduler = default_scheduler()
+        self.recursive = recursive
+        self.max_depth = max_depth if recursive else 0
+        self.excluded = compile_excludes(exclude)
+        self.sniffer = ContentSniffer() if sniff_content else None
+        self.names = NameIndex()
+        self.dedup = ContentDeduper(dedup_mode) if dedup_mode != "off" else None
+        # journal=None uses the shared journal from config, journal=False turns it off
+        self.journal = default_journal() if journal is None else (journal or None)
+        self.run_id = None
+        self._created_dirs = set()
+        self.observer = None
+        self._config_watcher = None
+        self.handler = DirOrganizerHandler(self)
+        start_exporter()
+
+    def add_root(self, root):
+        """
+        Register a folder to organize: a path, or {"path": ..., "categories": {...}}
+        whose categories take precedence over the global ones for that folder.
+        Example: {"path": "~/inbox", "categories": {"Invoices": [".pdf"]}}
+        """
+        path, root = _root_spec(root)
+        self._root_specs[path] = root
+        self.roots[path] = _root_rules(root, self.rules)
+        return path
+
+    @property
+    def rules(self):
+        return self._rule_set[0]
+
+    @property
+    def roots(self):
+        return self._rule_set[1]
+
+    def rules_for(self, base_dir):
+        rules, roots = self._rule_set
+        return roots.get(base_dir, rules)
+
+    def apply_config(self, config):
+        """
+        Switch to the rules of a reloaded config while watching. Everything is
+        compiled on the calling thread first and published in one assignment,
+        so workers never wait and never see half of a rule change.
+        Adding or removing watched folders still needs a restart.
+        """
+        rules = RuleIndex(config.get("categories", {}), config.get("rules", []))
+        specs = dict(self._root_specs)
+        for root in config.get("watch_directories", []):
+            path, root = _root_spec(root)
+            if path in specs:
+                specs[path] = root
+        roots = {path: _root_rules(root, rules) for path, root in specs.items()}
+
+        old_roots = self.roots
+        self._root_specs = specs
+        self._rule_set = (rules, roots)
+        self._settings_keys = {}
+        self.handle_duplicates = config.get("handle_duplicates", True)
+        sniff_content = config.get("sniff_content", False)
+        if sniff_content != (self.sniffer is not None):
+            self.sniffer = ContentSniffer() if sniff_content else None
         if self.gui_app:
-            self.gui_app.log(f"File watcher actively monitoring: {self.watch_dir}", "success")
-
-        self.observer.schedule(self.handler, path=self.watch_dir, recursive=False)
-        self.observer.start()
+            self.gui_app.log("Reloaded rules from config.json", "info")
+            for root in roots:
+                self._record_rules(root)
+            if RESORT_ON_CHANGE:
+                threading.Thread(target=self._resort_all, args=(old_roots,),
+                                 name="autosort-resort", daemon=True).start()
+
+    def _resort_all(self, old_roots):
+        # A separate organizer per folder, so the re-sort is journaled as its own run
+        for root, old_rules in old_roots.items():
+            if root not in self.roots or self.gui_app.stop_requested:
+                continue
+            # Diff against every folder used since the last re-sort, which may predate this session
+            old_folders = applied_folders(root) or rules_folders(old_rules)
+            organizer = DirOrganizer(root, self.gui_app, rules=self.roots[root],
+                                     journal=self.journal or False, dir_stats=self.dir_stats)
+            resort(organizer, root, old_folders)
+
+    def _record_rules(self, root):
+        # Where files are about to be sorted, so a later re-sort knows to look there
+        try:
+            record_applied_rules(root, self.rules_for(root))
+        except OSError as e:
+            if self.gui_app:
+                self.gui_app.log(f"Could not record the applied rules: {e}", "warning")
+
+    def root_of(self, file_path):
+        """The watched folder `file_path` belongs to (the deepest one if roots nest), or None."""
+        directory = os.path.dirname(file_path)
+        while directory not in self.roots:
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                return None
+            directory = parent
+        return directory
+
+    def start_watching(self):
+        """Start the observer and move workers and return; stop_watching() shuts them down."""
+        if self.gui_app:
+            for root in self.roots:
+                self.gui_app.log(f"File watcher actively monitoring: {root}", "success")
+
+        log = self.gui_app.log if self.gui_app else None
+        for root in self.roots:
+            self._record_rules(root)
+        if self.journal is not None:
+            self.run_id = self.journal.begin(os.pathsep.join(self.roots), "watch")
+        self.handler.start()
+        METRICS.gauge("queue_depth", self.handler.depth)
+        METRICS.gauge("pending_writes", self.handler.tracker.pending_count)
+        self.observer = start_observer(self.handler, list(self.roots), recursive=self.recursive, log=log,
+                                       watch_filter=self.wants_watch)
+        self._config_watcher = ConfigWatcher(self.apply_config, log=log) if RELOAD_CONFIG else None
+        if self._config_watcher:
+            self._config_watcher.start()
+
+    def stop_watching(self):
+        if self._config_watcher:
+            self._config_watcher.stop()
+            self._config_watcher = None
+        self.observer.stop()
+        self.observer.join()
+        self.handler.stop()
+        METRICS.remove_gauge("queue_depth")
+        METRICS.remove_gauge("pending_writes")
+        if self.journal is not None:
+            self.journal.end(self.run_id)
 
+    def start_gui(self):
+        self.start_watching()
         try:
             while self.gui_app and self.gui_app.is_watching:
                 time.sleep(1)
         except Exception:
             if self.gui_app:
                 self.gui_app.log("File watcher stopped.", "warning")
-            self.observer.stop()
         finally:
-            self.observer.join()
+            self.stop_watching()
 
     def _classify_existing_files_gui(self):
         if not self.gui_app:
-            return
-
-        files = [f for f in os.listdir(self.watch_dir) if os.path.isfile(os.path.join(self.watch_dir, f))]
-        total_files = len(files)
-        processed_files = 0
+            return 0
 
-        for i, file in enumerate(files, 1):
+        processed = 0
+        for root in self.roots:
             if self.gui_app.stop_requested:
-                self.gui_app.log(f"Organization stopped. Processed {processed_files} of {total_files} files.", "warning")
-                return
-
-            path = os.path.join(self.watch_dir, file)
-            self.classify_and_move_gui(path, self.watch_dir)
-            processed_files += 1
-
-            if i % 10 == 0:
-                self.gui_app.log(f"Progress: {i}/{total_files} files processed...", "info")
-
-        self.gui_app.log(f"Organized {total_files} existing files", "success")
+                break
+            # Files sorted under the categories of an earlier session move first,
+            # before the baseline they are diffed against could be lost
+            old_folders = applied_folders(root) if RESORT_ON_CHANGE else None
+            if old_folders is not None:
+                processed += resort(self, root, old_folders)
+            self._record_rules(root)
+            processed += BulkOrganizer(self).run(root)
+        return processed
+
+    def pruned_dirs(self, directory=None):
+        return self.rules_for(directory or self.watch_dir).category_dirs | {QUARANTINE_DIR}
+
+    def iter_files(self, directory=None):
+        """Stream (name, path) for every file the organizer is responsible for."""
+        directory = directory or self.watch_dir
+        return walk_files(directory, self.pruned_dirs(directory), self.excluded, self.max_depth)
+
+    def iter_entries(self, directory=None):
+        directory = directory or self.watch_dir
+        return walk_entries(directory, self.pruned_dirs(directory), self.excluded, self.max_depth)
+
+    def iter_changed_files(self, directory=None):
+        """
+        Like iter_files, minus the files the entry index shows unchanged since
+        the organizer last left them where they are.
+        """
+        directory = directory or self.watch_dir
+        if self.entry_index is None:
+            return self.iter_files(directory)
+        entries = self.entry_index.changed(directory, self.iter_entries(directory), self.settings_key(directory))
+        return ((entry.name, entry.path) for entry in entries)
+
+    def settings_key(self, base_dir):
+        """
+        Fingerprint of everything that decides whether a file in `base_dir`
+        stays put (rules, content sniffing, dedup mode), stored with entry
+        index rows so a config change makes them stale.
+        """
+        key = self._settings_keys.get(base_dir)
+        if key is None:
+            rules = self.rules_for(base_dir)
+            settings = [rules.categories, rules.match_rules, self.sniffer is not None,
+                        self.dedup.mode if self.dedup is not None else "off"]
+            key = hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+            self._settings_keys[base_dir] = key
+        return key
+
+    def _remember(self, base_dir, file_path, decision, original=None):
+        if self.entry_index is not None:
+            self.entry_index.remember(base_dir, file_path, decision, self.settings_key(base_dir), original)
+
+    def plan(self, directory=None):
+        """Dry run: the MovePlan for organizing `directory`, nothing is moved."""
+        should_stop = (lambda: self.gui_app.stop_requested) if self.gui_app else None
+        return build_plan(self, directory, should_stop)
+
+    def execute_plan(self, plan):
+        self._record_rules(plan.base_dir)
+        return BulkOrganizer(self).execute_plan(plan)
+
+    def in_scope(self, file_path, base_dir=None):
+        """Whether a watcher event for `file_path` concerns an unorganized file."""
+        base_dir = base_dir or self.watch_dir
+        relative = os.path.relpath(os.path.dirname(file_path), base_dir)
+        if relative == os.curdir:
+            return True
+        parts = relative.split(os.sep)
+        if parts[0] == os.pardir or parts[0] in self.pruned_dirs(base_dir):
+            return False
+        if self.max_depth is not None and len(parts) > self.max_depth:
+            return False
+        return not (self.excluded and any(self.excluded(part) for part in parts))
+
+    def wants_watch(self, directory):
+        """Whether a recursive watcher needs `directory`: files directly in it are in scope."""
+        file_path = os.path.join(directory, "")
+        base_dir = self.root_of(file_path)
+        return base_dir is not None and self.in_scope(file_path, base_dir)
 
     def classify_and_move_gui(self, file_path, base_dir):
         if not os.path.isfile(file_path) or not self.gui_app:
             return
 
-        file_name = os.path.basename(file_path)
-        _, ext = os.path.splitext(file_name)
-        ext = ext.lower()
-
-        destination_dir = self._detect_destination(ext, base_dir)
-        destination_path = os.path.join(destination_dir, file_name)
+        self.report(self.organize_file(file_path, base_dir))
+
+    def organize_file(self, file_path, base_dir, file_name=None):
+        """
+        Move one file into its category folder under `base_dir`.
+        Returns (status, file_name, detail) where status is "moved" (detail is
+        the folder, plus the copy rate when the file crossed devices), "kept",
+        "duplicate" (detail is the message) or "error".
+        """
+        with METRICS.timer("total"):
+            result = self._organize_file(file_path, base_dir, file_name)
+        # Files left in place are remembered so the next startup can skip them;
+        # skipped duplicates are remembered by _handle_duplicate, with their original
+        if result[0] == "kept":
+            self._remember(base_dir, file_path, "kept")
+        return result
+
+    def _organize_file(self, file_path, base_dir, file_name):
+        file_name = file_name or os.path.basename(file_path)
+        st = None
+        if self.dedup is not None or self.rules_for(base_dir).needs_stat:
+            try:
+                with METRICS.timer("stat"):
+                    st = os.stat(file_path)
+            except OSError as e:
+                return "error", file_name, str(e)
+
+        with METRICS.timer("classify"):
+            destination_dir = self.classify(file_path, file_name, base_dir, st)
 
         if os.path.dirname(file_path) == destination_dir:
-            return
-
-        if HANDLE_DUPLICATES:
-            destination_path = resolve_duplicate(destination_path)
+            return "kept", file_name, None
 
         try:
-            os.makedirs(destination_dir, exist_ok=True)
-            shutil.move(file_path, destination_path)
-            self.gui_app.increment_file_count()
-            folder_name = os.path.basename(destination_dir)
-            self.gui_app.log(f"{file_name} → {folder_name}/", "move")
+            if self.dedup is not None:
+                return self._move_unique(file_path, file_name, base_dir, destination_dir, st)
+            _, result = self._move(file_path, os.path.join(destination_dir, file_name))
         except Exception as e:
-            self.gui_app.log(f"Error moving {file_name}: {str(e)}", "error")
+            return "error", file_name, str(e)
+
+        return "moved", file_name, self._moved_to(destination_dir, result)
+
+    def classify(self, file_path, file_name, base_dir, st=None):
+        """
+        The destination folder for a file: the first matching entry of "rules",
+        else its extension. Files neither matches are sniffed by content when
+        sniff_content is on (e.g. "download" → PDF).
+        """
+        rules = self.rules_for(base_dir)
+        if st is None and rules.needs_stat:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                pass
+        destination_dir = rules.destination(file_name, base_dir, st)
+        if self.sniffer is None or destination_dir != rules.others(base_dir):
+            return destination_dir
+
+        with METRICS.timer("sniff"):
+            ext = self.sniffer.sniff(file_path, st)
+        if ext is None:
+            return destination_dir
+        return rules.lookup(ext, base_dir) or destination_dir
 
     @staticmethod
-    def _detect_destination(ext, base_dir):
-        docs = FILE_CATEGORIES.get("Documents", {})
-
-        for subcat, extensions in docs.items():
-            if ext in extensions:
-                return os.path.join(base_dir, "Documents", subcat)
-
-        for cat, extensions in FILE_CATEGORIES.items():
-            if isinstance(extensions, dict):
-                continue
-            if ext in extensions:
-                return os.path.join(base_dir, cat)
-
-        return os.path.join(base_dir, "Others")
+    def _moved_to(destination_dir, result):
+        folder = f"{os.path.basename(destination_dir)}/"
+        if not result.copied:
+            return folder
+        rate = result.bytes / result.seconds if result.seconds > 0 else result.bytes
+        return f"{folder} ({format_size(result.bytes)} copied at {format_size(rate)}/s)"
+
+    def report(self, result):
+        status, file_name, detail = result
+        METRICS.incr(f"files_{status}")
+        with METRICS.timer("report"):
+            if status in ("moved", "quarantined"):
+                self.gui_app.increment_file_count()
+                self.gui_app.log(f"{file_name} → {detail}", "move")
+            elif status == "duplicate":
+                self.gui_app.log(detail, "info")
+            elif status == "error":
+                self.gui_app.log(f"Error moving {file_name}: {detail}", "error")
+
+    def _ensure_dir(self, destination_dir):
+        if destination_dir not in self._created_dirs:
+            with METRICS.timer("makedirs"):
+                os.makedirs(destination_dir, exist_ok=True)
+            self._created_dirs.add(destination_dir)
+
+    def _move(self, file_path, destination_path, retry=True):
+        directory = os.path.dirname(destination_path)
+        self._ensure_dir(directory)
+        try:
+            destination_path, result = self._claim_and_move(file_path, destination_path)
+        except FileNotFoundError:
+            if not retry or os.path.isdir(directory):
+                raise
+            # The folder was deleted after this organizer created it (e.g. while
+            # watching): forget it and create it again
+            self._created_dirs.discard(directory)
+            self.names.forget(directory)
+            return self._move(file_path, destination_path, retry=False)
+        if result.copied:
+            METRICS.incr("bytes_copied", result.bytes)
+        self._record_move(file_path, destination_path)
+        return destination_path, result
+
+    def _record_move(self, file_path, destination_path):
+        if self.journal is not None and self.run_id is not None:
+            self.journal.moved(self.run_id, file_path, destination_path)
+        if self.dir_stats is not None:
+            self.dir_stats.file_moved(file_path, destination_path)
+
+    def _claim_and_move(self, file_path, destination_path):
+        # Claim the final name so concurrent movers never pick the same one
+        with METRICS.timer("claim"):
+            destination_path = self.names.claim(destination_path, self.handle_duplicates)
+        try:
+            with METRICS.timer("move"):
+                if self.scheduler is not None:
+                    result = self.scheduler.move(file_path, destination_path)
+                else:
+                    result = move_file(file_path, destination_path)
+        except Exception:
+            if self.handle_duplicates:
+                self.names.abandon(destination_path)
+            raise
+        return destination_path, result
+
+    def _move_unique(self, file_path, file_name, base_dir, destination_dir, st):
+        with self.dedup.guard(destination_dir, st.st_size):
+            with METRICS.timer("dedup"):
+                original = self.dedup.find_duplicate(file_path, destination_dir, st)
+            if original is not None:
+                return self._handle_duplicate(file_path, file_name, base_dir, destination_dir, original)
+
+            destination_path, result = self._move(file_path, os.path.join(destination_dir, file_name))
+            self.dedup.record(destination_path, st.st_size)
+        return "moved", file_name, self._moved_to(destination_dir, result)
+
+    def _handle_duplicate(self, file_path, file_name, base_dir, destination_dir, original):
+        original_name = os.path.basename(original)
+        if self.dedup.mode == "quarantine":
+            _, result = self._move(file_path, os.path.join(base_dir, QUARANTINE_DIR, file_name))
+            return "quarantined", file_name, self._moved_to(QUARANTINE_DIR, result)
+
+        if self.dedup.mode == "hardlink":
+            destination_path = os.path.join(destination_dir, file_name)
+            destination_path = self.names.claim(destination_path, self.handle_duplicates)
+            link_path = f"{destination_path}.autosort-link"
+            try:
+                os.link(original, link_path)
+                os.replace(link_path, destination_path)
+            except OSError:
+                # Filesystem without hard links, or another device: keep the copy
+                if os.path.lexists(link_path):
+                    os.remove(link_path)
+                if self.handle_duplicates:
+                    self.names.abandon(destination_path)
+                destination_path, result = self._move(file_path, os.path.join(destination_dir, file_name))
+                self.dedup.record(destination_path, os.path.getsize(destination_path))
+                return "moved", file_name, self._moved_to(destination_dir, result)
+            os.remove(file_path)
+            # Journaled as a move, so undo puts the file back (as a copy of the link)
+            self._record_move(file_path, destination_path)
+            return "duplicate", file_name, f"{file_name} is identical to {original_name}, hard-linked"
+
+        self._remember(base_dir, file_path, "duplicate", original)
+        return "duplicate", file_name, f"{file_name} is identical to {original_name}, skipped"
+
+    def _detect_destination(self, file_name, base_dir):
+        return self.classify(os.path.join(base_dir, file_name), file_name, base_dir)
+
+
+def _root_spec(root):
+    if isinstance(root, str):
+        root = {"path": root}
+    return os.path.abspath(os.path.expanduser(root["path"])), root
+
+
+def _root_rules(root, rules):
+    """The RuleIndex for one watched folder: its own categories and rules first, then the global ones."""
+    overrides = root.get("categories")
+    match_rules = root.get("rules")
+    if not overrides and not match_rules:
+        return rules
+    categories = dict(overrides or {})
+    for name, value in rules.categories.items():
+        categories.setdefault(name, value)
+    return RuleIndex(categories, (match_rules or []) + rules.match_rules)
 
 
 class DirOrganizerHandler(FileSystemEventHandler):
-    def __init__(self, base_dir, gui_app):
+    """
+    One handler, queue and worker pool for every watched root; events are
+    routed to their root by path, so adding roots adds no threads here.
+    """
+
+    def __init__(self, organizer):
         super().__init__()
-        self.base_dir = base_dir
-        self.gui_app = gui_app
+        self.organizer = organizer
+        self.gui_app = organizer.gui_app
+        log = self.gui_app.log if self.gui_app else None
+        self.queue = WorkQueue(self._on_dequeued, log=log)
+        # Big files get their own workers so they never hold up small ones
+        scheduler = organizer.scheduler
+        self.large_queue = None
+        if scheduler is not None and scheduler.small_file_bytes:
+            self.large_queue = WorkQueue(self._on_dequeued, workers=scheduler.large_workers, log=log)
+        self.tracker = StabilityTracker(self.put, log=log)
+
+    def start(self):
+        self.queue.start()
+        if self.large_queue is not None:
+            self.large_queue.start()
+        self.tracker.start()
+
+    def stop(self):
+        self.tracker.stop()
+        self.queue.stop()
+        if self.large_queue is not None:
+            self.large_queue.stop()
+
+    def put(self, file_path):
+        if self.large_queue is not None and self.organizer.scheduler.is_large(file_path):
+            self.large_queue.put(file_path)
+        else:
+            self.queue.put(file_path)
+
+    def depth(self):
+        return self.queue.depth() + (self.large_queue.depth() if self.large_queue is not None else 0)
+
+    def _wanted(self, file_path):
+        base_dir = self.organizer.root_of(file_path)
+        if base_dir is None:
+            return False
+
+        if self.organizer.rules_for(base_dir).is_temp(os.path.basename(file_path)):
+            return False
+
+        return not self.organizer.recursive or self.organizer.in_scope(file_path, base_dir)
 
     def on_created(self, event):
         if event.is_directory:
             return
 
-        temp_exts = FILE_CATEGORIES.get("Temp", [])
-        if any(event.src_path.endswith(ext) for ext in temp_exts):
+        if self.organizer.dir_stats is not None:
+            self.organizer.dir_stats.file_added(event.src_path)
+
+        if not self._wanted(event.src_path):
             return
 
-        # Safe file — classify normally with GUI updates
-        time.sleep(0.5)  # Give time for file to be completely written
+        # Safe file — classified once it has finished being written
+        self.tracker.track(event.src_path)
+
+    def _on_dequeued(self, file_path):
         if self.gui_app and self.gui_app.is_watching:
-            self._process_file_with_gui(event.src_path)
+            self._process_file_with_gui(file_path)
 
     def on_moved(self, event):
         if event.is_directory:
             return
 
-        temp_exts = FILE_CATEGORIES.get("Temp", [])
-        if any(event.dest_path.endswith(ext) for ext in temp_exts):
-            return
+        if self.organizer.dir_stats is not None:
+            self.organizer.dir_stats.file_removed(event.src_path)
+            self.organizer.dir_stats.file_added(event.dest_path)
 
-        if self.gui_app and self.gui_app.is_watching:
-            self._process_file_with_gui(event.dest_path)
-
-    def _process_file_with_gui(self, file_path):
-        if not os.path.isfile(file_path):
+        if not self._wanted(event.dest_path):
             return
 
-        file_name = os.path.basename(file_path)
-        _, ext = os.path.splitext(file_name)
-        ext = ext.lower()
-
-        destination_dir = DirOrganizer._detect_destination(ext, self.base_dir)
-        destination_path = os.path.join(destination_dir, file_name)
+        self.put(event.dest_path)
 
-        if os.path.dirname(file_path) == destination_dir:
-            return
+    def on_deleted(self, event):
+        if not event.is_directory and self.organizer.dir_stats is not None:
+            self.organizer.dir_stats.file_removed(event.src_path)
 
-        if HANDLE_DUPLICATES:
-            destination_path = resolve_duplicate(destination_path)
+    def _process_file_with_gui(self, file_path):
+        with METRICS.timer("stat"):
+            if not os.path.isfile(file_path):
+                return
 
-        try:
-            os.makedirs(destination_dir, exist_ok=True)
-            shutil.move(file_path, destination_path)
-            self.gui_app.increment_file_count()
-            folder_name = os.path.basename(destination_dir)
-            self.gui_app.log(f"{file_name} → {folder_name}/", "move")
-        except Exception as e:
-            self.gui_app.log(f"Error moving {file_name}: {str(e)}", "error")
+        base_dir = self.organizer.root_of(file_path)
+        if base_dir is not None:
+            self.organizer.report(self.organizer.organize_file(file_path, base_dir))
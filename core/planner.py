@@ -0,0 +1,128 @@
+import os
+from array import array
+from collections import namedtuple
+
+from utils.file_utils import NameIndex
+
+PlannedMove = namedtuple("PlannedMove", ["source", "destination", "size", "category"])
+
+
+class MovePlan:
+    """
+    The moves a bulk run would make, computed without touching any file.
+    Folder paths are interned and the per-file data lives in flat arrays,
+    so a million planned moves cost a few tens of MB: one name string plus
+    a handful of integers each. The final name is stored only for files
+    that get a duplicate "(N)" suffix.
+    """
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self.categories = {}
+        self._dirs = []
+        self._dir_ids = {}
+        self._categories = []
+        self._category_ids = {}
+        self._names = []
+        self._sources = array("I")
+        self._destinations = array("I")
+        self._category_of = array("I")
+        self._sizes = array("Q")
+        self._renamed = {}
+
+    def _intern(self, value, values, ids):
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(values)
+            values.append(value)
+        return index
+
+    def add(self, source_path, destination_path, size, category):
+        source_dir, name = os.path.split(source_path)
+        destination_dir, final_name = os.path.split(destination_path)
+        index = len(self._names)
+        self._names.append(name)
+        self._sources.append(self._intern(source_dir, self._dirs, self._dir_ids))
+        self._destinations.append(self._intern(destination_dir, self._dirs, self._dir_ids))
+        self._category_of.append(self._intern(category, self._categories, self._category_ids))
+        self._sizes.append(size)
+        if final_name != name:
+            self._renamed[index] = final_name
+
+        totals = self.categories.setdefault(category, [0, 0])
+        totals[0] += 1
+        totals[1] += size
+
+    def __len__(self):
+        return len(self._names)
+
+    @property
+    def total_bytes(self):
+        return sum(totals[1] for totals in self.categories.values())
+
+    def move(self, index):
+        name = self._names[index]
+        return PlannedMove(
+            os.path.join(self._dirs[self._sources[index]], name),
+            os.path.join(self._dirs[self._destinations[index]], self._renamed.get(index, name)),
+            self._sizes[index],
+            self._categories[self._category_of[index]],
+        )
+
+    def __iter__(self):
+        for index in range(len(self._names)):
+            yield self.move(index)
+
+    def grouped_order(self):
+        """Entry indices ordered by destination folder (a counting sort, one array)."""
+        starts = array("I", bytes(4 * (len(self._dirs) + 1)))
+        for destination in self._destinations:
+            starts[destination + 1] += 1
+        for i in range(1, len(starts)):
+            starts[i] += starts[i - 1]
+        order = array("I", bytes(4 * len(self._names)))
+        for index, destination in enumerate(self._destinations):
+            order[starts[destination]] = index
+            starts[destination] += 1
+        return order
+
+    def summary(self):
+        return {
+            "directory": self.base_dir,
+            "files": len(self),
+            "bytes": self.total_bytes,
+            "renamed": len(self._renamed),
+            "categories": {
+                category: {"files": files, "bytes": size}
+                for category, (files, size) in sorted(self.categories.items())
+            },
+        }
+
+
+def build_plan(organizer, directory=None, should_stop=None):
+    """
+    Walk `directory` (the organizer's watch folder by default) and plan every
+    move with the organizer's rules, including duplicate renames, without
+    moving or creating anything.
+    """
+    directory = directory or organizer.watch_dir
+    plan = MovePlan(directory)
+    names = NameIndex()
+
+    for entry in organizer.iter_entries(directory):
+        if should_stop and should_stop():
+            break
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        destination_dir = organizer.classify(entry.path, entry.name, directory, st)
+        if os.path.dirname(entry.path) == destination_dir:
+            continue
+
+        destination_path = os.path.join(destination_dir, entry.name)
+        if organizer.handle_duplicates:
+            destination_path = names.preview(destination_path)
+        plan.add(entry.path, destination_path, st.st_size, os.path.relpath(destination_dir, directory))
+
+    return plan
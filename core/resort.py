@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+
+from core.bulk import BulkOrganizer
+from core.config import APPLIED_RULES_PATH
+from core.rules import OTHERS_DIR, RuleIndex
+
+STATE_VERSION = 2
+
+_state_lock = threading.Lock()
+
+
+def load_applied_rules(path=APPLIED_RULES_PATH):
+    """
+    {watched folder: {extension: [folders]}}: every folder each extension has
+    been sorted into since the folder was last re-sorted.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get("version") == STATE_VERSION:
+        return state["folders"]
+    # Version 1 kept the categories last applied to each folder
+    return {directory: _folder_lists(RuleIndex(categories)) for directory, categories in state.items()}
+
+
+def applied_folders(directory, path=APPLIED_RULES_PATH):
+    """{extension: set of folders} recorded for `directory`, or None if it was never organized."""
+    folders = load_applied_rules(path).get(directory)
+    if folders is None:
+        return None
+    return {ext: set(names) for ext, names in folders.items()}
+
+
+def rules_folders(rules):
+    """{extension: {folder}} for one RuleIndex, in the form applied_folders() returns."""
+    return {ext: {folder} for ext, folder in rules.folders.items()}
+
+
+def record_applied_rules(directory, rules, path=APPLIED_RULES_PATH):
+    """
+    Add the folders `rules` sort each extension into to what `directory` has
+    seen, so a later resort() also looks where earlier rules put files.
+    An extension that gained or lost a category also keeps Others.
+    """
+    def merge(folders):
+        if folders is None:
+            return _folder_lists(rules)
+        current = rules.folders
+        merged = {ext: set(names) for ext, names in folders.items()}
+        for ext in merged.keys() | current.keys():
+            names = merged.setdefault(ext, {OTHERS_DIR})
+            names.add(current.get(ext, OTHERS_DIR))
+        return {ext: sorted(names) for ext, names in merged.items()}
+
+    _update(directory, merge, path)
+
+
+def save_applied_rules(directory, rules, path=APPLIED_RULES_PATH):
+    """Forget the earlier folders of `directory`: everything is where `rules` puts it."""
+    _update(directory, lambda folders: _folder_lists(rules), path)
+
+
+def _update(directory, change, path):
+    with _state_lock:
+        state = load_applied_rules(path)
+        folders = change(state.get(directory))
+        if state.get(directory) == folders:
+            return
+        state[directory] = folders
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": STATE_VERSION, "folders": state}, f, indent=4)
+        os.replace(temp_path, path)
+
+
+def _folder_lists(rules):
+    return {ext: [folder] for ext, folder in rules.folders.items()}
+
+
+def changed_extensions(old_folders, new_rules):
+    """{extension: (earlier folders, new folder)} for every extension that was sorted elsewhere."""
+    new_folders = new_rules.folders
+    changes = {}
+    for ext in old_folders.keys() | new_folders.keys():
+        after = new_folders.get(ext, OTHERS_DIR)
+        before = old_folders.get(ext, {OTHERS_DIR}) - {after}
+        if before:
+            changes[ext] = (before, after)
+    return changes
+
+
+def resort_candidates(directory, old_folders, new_rules):
+    """
+    Files under `directory` that earlier rules put somewhere the new ones
+    would not. Only the folders the changed extensions were sorted into (and
+    Others, for extensions that gained a category) are listed, one level deep.
+    Example: ".svg" moved from Images to Design → only Images/ is listed.
+    """
+    changes = changed_extensions(old_folders, new_rules)
+    folders = set().union(*(before for before, _ in changes.values())) if changes else set()
+    for folder in sorted(folders):
+        try:
+            with os.scandir(os.path.join(directory, folder)) as it:
+                entries = [entry for entry in it if entry.is_file()]
+        except OSError:
+            continue
+        for entry in entries:
+            # Only files earlier rules put here; anything placed by hand stays
+            after = new_rules.relative_destination(entry.name)
+            if after != folder and folder in _earlier_folders(entry.name, old_folders, new_rules):
+                yield entry.path
+
+
+def _earlier_folders(file_name, old_folders, rules):
+    folders = set()
+    for suffix in rules.suffixes(file_name):
+        folders |= old_folders.get(suffix, set())
+    return folders or {OTHERS_DIR}
+
+
+def resort(organizer, directory, old_folders):
+    """
+    Move the files affected by a change from `old_folders` (see
+    applied_folders) to the organizer's current rules for `directory`. Moves
+    go through the bulk engine, so they are batched, journaled (and
+    undoable) like any other run. Returns the number of files processed.
+    """
+    new_rules = organizer.rules_for(directory)
+    changes = changed_extensions(old_folders, new_rules)
+    app = organizer.gui_app
+    if not changes:
+        return 0
+
+    app.log(f"Re-sorting {directory}: {len(changes)} extensions changed category", "info")
+    processed = BulkOrganizer(organizer).run_paths(directory, resort_candidates(directory, old_folders, new_rules))
+    if not app.stop_requested:
+        save_applied_rules(directory, new_rules)
+    return processed
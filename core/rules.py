@@ -0,0 +1,264 @@
+import fnmatch
+import os
+import re
+import time
+
+OTHERS_DIR = "Others"
+TEMP_CATEGORY = "Temp"
+SIZE_UNITS = {"b": 1, "kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3, "tb": 1024 ** 4}
+SIZE_PATTERN = re.compile(r"\s*(\d+(?:\.\d+)?)\s*([kmgt]?b)?\s*", re.IGNORECASE)
+DAY = 86400
+# \1 or (?(1)...): group numbers that shift once patterns are combined
+NUMBERED_REFERENCE = re.compile(r"\\[1-9]|\(\?\(\d")
+
+
+class RuleIndex:
+    """
+    Lookup tables compiled once from the "categories" config.
+    Categories may be nested to any depth; an extension maps to the
+    folder path of the first category that lists it.
+    Example: {"Documents": {"PDF": [".pdf"]}} → .pdf → Documents/PDF
+    """
+
+    def __init__(self, categories, match_rules=()):
+        self.categories = categories
+        self.match_rules = list(match_rules)
+        self.matcher = RuleMatcher(self.match_rules) if self.match_rules else None
+        # Size and age rules need the file's stat; name-only rules and extensions don't
+        self.needs_stat = self.matcher is not None and self.matcher.needs_stat
+        self._relative = {}
+        self._max_parts = 1
+        self._bound = {}
+        self._compile(categories, ())
+        self.temp_suffixes = frozenset(
+            _normalize(ext) for ext in _flatten(categories.get(TEMP_CATEGORY, []))
+        )
+        self.category_dirs = frozenset(categories) | {OTHERS_DIR}
+        if self.matcher is not None:
+            self.category_dirs |= {rule.destination[0] for rule in self.matcher.rules}
+
+    def _compile(self, node, parents):
+        for name, value in node.items():
+            path = parents + (name,)
+            if isinstance(value, dict):
+                self._compile(value, path)
+                continue
+
+            relative = os.path.join(*path)
+            for ext in value:
+                ext = _normalize(ext)
+                self._relative.setdefault(ext, relative)
+                self._max_parts = max(self._max_parts, ext.count("."))
+
+    def _suffixes(self, file_name):
+        # Shortest suffix first: ".gz", then ".tar.gz", ...
+        name = file_name.lower()
+        end = len(name)
+        for _ in range(self._max_parts):
+            dot = name.rfind(".", 1, end)
+            if dot <= 0:
+                return
+            yield name[dot:]
+            end = dot
+
+    def _bind(self, base_dir):
+        destinations = {ext: os.path.join(base_dir, rel) for ext, rel in self._relative.items()}
+        matched = tuple(os.path.join(base_dir, *rule.destination) for rule in self.matcher.rules) \
+            if self.matcher is not None else ()
+        bound = (destinations, os.path.join(base_dir, OTHERS_DIR), matched)
+        self._bound[base_dir] = bound
+        return bound
+
+    def suffixes(self, file_name):
+        """The extensions of `file_name` this index can match, shortest first."""
+        return self._suffixes(file_name)
+
+    def relative_destination(self, file_name):
+        match = OTHERS_DIR
+        for suffix in self._suffixes(file_name):
+            relative = self._relative.get(suffix)
+            if relative is not None:
+                match = relative
+        return match
+
+    def destination(self, file_name, base_dir, st=None):
+        destinations, others, matched = self._bound.get(base_dir) or self._bind(base_dir)
+        if self.matcher is not None:
+            index = self.matcher.match(file_name, st)
+            if index is not None:
+                return matched[index]
+
+        match = others
+        for suffix in self._suffixes(file_name):
+            destination = destinations.get(suffix)
+            if destination is not None:
+                match = destination
+        return match
+
+    @property
+    def folders(self):
+        """{extension: relative folder} for every extension a category lists."""
+        return self._relative
+
+    def lookup(self, ext, base_dir):
+        """The destination for one exact extension, or None if no category lists it."""
+        destinations = (self._bound.get(base_dir) or self._bind(base_dir))[0]
+        return destinations.get(ext)
+
+    def others(self, base_dir):
+        return (self._bound.get(base_dir) or self._bind(base_dir))[1]
+
+    def is_temp(self, file_name):
+        for suffix in self._suffixes(file_name):
+            if suffix in self.temp_suffixes:
+                return True
+        return False
+
+
+class MatchRule:
+    __slots__ = ("position", "destination", "pattern", "regex", "min_size", "max_size", "older", "newer")
+
+    def __init__(self, position, rule):
+        if not isinstance(rule, dict) or not isinstance(rule.get("destination"), str):
+            raise ValueError(f"rule {position + 1} needs a \"destination\" folder")
+        self.position = position
+        self.destination = tuple(part for part in re.split(r"[\\/]", rule["destination"]) if part)
+        if not self.destination or os.pardir in self.destination:
+            raise ValueError(f"rule {position + 1}: invalid destination {rule['destination']!r}")
+
+        self.pattern = self.regex = None
+        for key in ("name", "regex"):
+            if key in rule and not isinstance(rule[key], str):
+                raise ValueError(f"rule {position + 1}: \"{key}\" must be a string")
+        if "name" in rule:
+            # Globs match the whole name and ignore case, like extensions do
+            self.pattern = f"(?i:{fnmatch.translate(rule['name'])[:-2]})"
+        elif "regex" in rule:
+            self.pattern = rule["regex"]
+        if self.pattern is not None:
+            try:
+                self.regex = re.compile(self.pattern)
+            except re.error as e:
+                raise ValueError(f"rule {position + 1}: invalid pattern: {e}") from e
+
+        try:
+            self.min_size = parse_size(rule["min_size"]) if "min_size" in rule else None
+            self.max_size = parse_size(rule["max_size"]) if "max_size" in rule else None
+        except ValueError as e:
+            raise ValueError(f"rule {position + 1}: {e}") from e
+        self.older = _days(rule, "older_than_days", position)
+        self.newer = _days(rule, "newer_than_days", position)
+        if self.pattern is None and not self.has_predicates:
+            raise ValueError(f"rule {position + 1} matches every file")
+
+    @property
+    def has_predicates(self):
+        return not (self.min_size is None and self.max_size is None
+                    and self.older is None and self.newer is None)
+
+    def accepts(self, st, now):
+        if not self.has_predicates:
+            return True
+        if st is None:
+            return False
+        if self.min_size is not None and st.st_size < self.min_size:
+            return False
+        if self.max_size is not None and st.st_size > self.max_size:
+            return False
+        age = now - st.st_mtime
+        if self.older is not None and age < self.older:
+            return False
+        return self.newer is None or age <= self.newer
+
+
+class RuleMatcher:
+    """
+    The ordered "rules" config, checked before extensions; the first rule whose
+    name pattern and size/age limits all hold wins.
+    Example: {"name": "invoice_*.pdf", "destination": "Finance"}
+    Every name pattern is folded into one alternation, so a file name is
+    scanned once by the regex engine however many rules there are; size and
+    age come from a stat the caller already made. Patterns that refer to
+    their own groups (by number, or by a name another rule could reuse) are
+    matched on their own instead.
+    """
+
+    def __init__(self, rules):
+        self.rules = [MatchRule(position, rule) for position, rule in enumerate(rules)]
+        self.needs_stat = any(rule.has_predicates for rule in self.rules)
+        self._separate = [rule for rule in self.rules if not _combinable(rule)]
+        named = [rule for rule in self.rules if _combinable(rule)]
+        self._groups = {f"_rule{rule.position}": rule.position for rule in named}
+        try:
+            self._names = re.compile("|".join(
+                f"(?P<_rule{rule.position}>{rule.pattern})" for rule in named
+            )) if named else None
+        except re.error as e:
+            raise ValueError(f"rules cannot be combined: {e}") from e
+
+    def match(self, file_name, st=None):
+        """The position of the first matching rule, or None."""
+        now = time.time() if st is not None and self.needs_stat else 0
+        found = self._names.fullmatch(file_name) if self._names is not None else None
+        first = self._groups[found.lastgroup] if found else len(self.rules)
+
+        for rule in self._separate:
+            if rule.position > first:
+                break
+            if rule.regex is not None and not rule.regex.fullmatch(file_name):
+                continue
+            if rule.accepts(st, now):
+                return rule.position
+        if found is None:
+            return None
+        if self.rules[first].accepts(st, now):
+            return first
+
+        # The first name match failed its size/age limits: try the later rules one by one
+        for rule in self.rules[first + 1:]:
+            if rule.regex is not None and not rule.regex.fullmatch(file_name):
+                continue
+            if rule.accepts(st, now):
+                return rule.position
+        return None
+
+
+def _days(rule, key, position):
+    """`key` of a rule in seconds, or None if the rule doesn't set it."""
+    if key not in rule:
+        return None
+    try:
+        if isinstance(rule[key], bool):
+            raise TypeError
+        return float(rule[key]) * DAY
+    except (TypeError, ValueError):
+        raise ValueError(f"rule {position + 1}: \"{key}\" must be a number of days") from None
+
+
+def _combinable(rule):
+    return rule.regex is not None and not rule.regex.groupindex \
+        and not NUMBERED_REFERENCE.search(rule.pattern)
+
+
+def parse_size(value):
+    """Bytes from a number or a string such as "2GB" or "500 kb"."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    found = SIZE_PATTERN.fullmatch(value) if isinstance(value, str) else None
+    if found is None:
+        raise ValueError(f"invalid size {value!r}")
+    number, unit = found.groups()
+    return int(float(number) * SIZE_UNITS[(unit or "b").lower()])
+
+
+def _normalize(ext):
+    ext = ext.lower()
+    return ext if ext.startswith(".") else f".{ext}"
+
+
+def _flatten(node):
+    if isinstance(node, dict):
+        for value in node.values():
+            yield from _flatten(value)
+    else:
+        yield from node
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+
+from core.config import (MOVE_BANDWIDTH, MOVE_IOPS, DEVICE_CONCURRENCY, SMALL_FILE_BYTES,
+                         LARGE_FILE_WORKERS)
+from core.metrics import METRICS
+from core.mover import move_file
+from core.rules import parse_size
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler():
+    """The process-wide MoveScheduler from config, or None when no limit is set."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            scheduler = MoveScheduler()
+            _default = scheduler if scheduler.enabled else False
+        return _default or None
+
+
+class TokenBucket:
+    """
+    Paces a rate (bytes or operations per second). take() may overdraw the
+    bucket; the caller then sleeps until its share is paid off, so a large
+    request is never refused, only spread out.
+    """
+
+    def __init__(self, rate):
+        self.rate = float(rate)
+        self._tokens = self.rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, amount):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            with METRICS.timer("throttle"):
+                time.sleep(wait)
+
+
+class MoveScheduler:
+    """
+    Sits in front of every move made by the organizer, in bulk runs and while
+    watching. It caps moves per second, copy bandwidth (only bytes that are
+    really copied across devices count) and concurrent moves per destination
+    device. Files above small_file_bytes are sent to a separate large-file
+    lane by the callers, so a few big copies never hold up small documents.
+    """
+
+    def __init__(self, bandwidth=MOVE_BANDWIDTH, iops=MOVE_IOPS, device_concurrency=DEVICE_CONCURRENCY,
+                 small_file_bytes=SMALL_FILE_BYTES, large_workers=LARGE_FILE_WORKERS):
+        bandwidth = parse_size(bandwidth) if bandwidth else 0
+        self.bandwidth = TokenBucket(bandwidth) if bandwidth else None
+        self.iops = TokenBucket(iops) if iops else None
+        self.device_concurrency = int(device_concurrency or 0)
+        self.small_file_bytes = parse_size(small_file_bytes) if small_file_bytes else 0
+        self.large_workers = max(1, int(large_workers))
+        self.enabled = bool(self.bandwidth or self.iops or self.device_concurrency or self.small_file_bytes)
+        self._devices = {}   # destination folder → st_dev
+        self._slots = {}     # st_dev → semaphore
+        self._lock = threading.Lock()
+
+    def is_large(self, path):
+        """Whether `path` belongs in the large-file lane."""
+        if not self.small_file_bytes:
+            return False
+        try:
+            return os.stat(path).st_size > self.small_file_bytes
+        except OSError:
+            return False
+
+    def _device_slots(self, directory):
+        device = self._devices.get(directory)
+        if device is None:
+            device = os.stat(directory).st_dev
+            self._devices[directory] = device
+        with self._lock:
+            slots = self._slots.get(device)
+            if slots is None:
+                slots = self._slots[device] = threading.BoundedSemaphore(self.device_concurrency)
+        return slots
+
+    def move(self, source_path, destination_path):
+        """move_file() within the configured limits."""
+        if self.iops is not None:
+            self.iops.take(1)
+        throttle = self.bandwidth.take if self.bandwidth is not None else None
+        if not self.device_concurrency:
+            return move_file(source_path, destination_path, throttle=throttle)
+
+        slots = self._device_slots(os.path.dirname(destination_path))
+        with METRICS.timer("device_wait"):
+            slots.acquire()
+        try:
+            return move_file(source_path, destination_path, throttle=throttle)
+        finally:
+            slots.release()
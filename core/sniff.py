@@ -0,0 +1,139 @@
+import os
+import threading
+from collections import OrderedDict
+
+from core.config import SNIFF_BYTES
+
+CACHE_SIZE = 65536
+
+# (offset, magic bytes, extension); refined below for containers (ZIP, RIFF, ...)
+SIGNATURES = [
+    (0, b"%PDF-", ".pdf"),
+    (0, b"PK\x03\x04", ".zip"),
+    (0, b"\x89PNG\r\n\x1a\n", ".png"),
+    (0, b"\xff\xd8\xff", ".jpg"),
+    (0, b"GIF87a", ".gif"),
+    (0, b"GIF89a", ".gif"),
+    (0, b"RIFF", ".riff"),
+    (0, b"II*\x00", ".tiff"),
+    (0, b"MM\x00*", ".tiff"),
+    (0, b"\x00\x00\x01\x00", ".ico"),
+    (4, b"ftyp", ".mp4"),
+    (0, b"\x1aE\xdf\xa3", ".mkv"),
+    (0, b"FLV\x01", ".flv"),
+    (0, b"ID3", ".mp3"),
+    (0, b"\xff\xfb", ".mp3"),
+    (0, b"OggS", ".ogg"),
+    (0, b"fLaC", ".flac"),
+    (0, b"\xff\xf1", ".aac"),
+    (0, b"\xff\xf9", ".aac"),
+    (0, b"Rar!\x1a\x07", ".rar"),
+    (0, b"7z\xbc\xaf\x27\x1c", ".7z"),
+    (0, b"\x1f\x8b", ".gz"),
+    (257, b"ustar", ".tar"),
+    (0, b"\x7fELF", ".elf"),
+    (0, b"MZ", ".exe"),
+    (0, b"{\\rtf", ".rtf"),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", ".ole"),
+]
+
+OOXML_PARTS = [(b"word/", ".docx"), (b"xl/", ".xlsx"), (b"ppt/", ".pptx")]
+OPENDOCUMENT_TYPES = [(b"opendocument.text", ".odt")]
+RIFF_TYPES = {b"WEBP": ".webp", b"WAVE": ".wav", b"AVI ": ".avi"}
+QUICKTIME_BRANDS = {b"qt  ": ".mov"}
+AUDIO_BRANDS = {b"M4A ": ".m4a", b"M4B ": ".m4a"}
+OLE_STREAMS = [("WordDocument", ".doc"), ("Workbook", ".xls"), ("PowerPoint Document", ".ppt")]
+
+
+def _compile(signatures):
+    """Group signatures by (offset, length) so a header is checked with one dict lookup per group."""
+    groups = {}
+    for offset, magic, ext in signatures:
+        groups.setdefault((offset, len(magic)), {})[magic] = ext
+    # Longest magic first, so b"\x1f\x8b" never shadows a longer signature
+    return sorted(groups.items(), key=lambda item: -item[0][1])
+
+
+COMPILED_SIGNATURES = _compile(SIGNATURES)
+
+
+def _refine(ext, header):
+    if ext == ".zip":
+        if header[30:38] == b"mimetype":
+            for marker, refined in OPENDOCUMENT_TYPES:
+                if marker in header[38:120]:
+                    return refined
+        for marker, refined in OOXML_PARTS:
+            if marker in header:
+                return refined
+        return ext
+    if ext == ".riff":
+        return RIFF_TYPES.get(header[8:12])
+    if ext == ".mp4":
+        brand = header[8:12]
+        return QUICKTIME_BRANDS.get(brand) or AUDIO_BRANDS.get(brand) or ext
+    if ext == ".mkv":
+        return ".webm" if b"webm" in header[:64] else ext
+    if ext == ".ole":
+        for stream, refined in OLE_STREAMS:
+            if stream.encode("utf-16-le") in header:
+                return refined
+        return None
+    return ext
+
+
+def match_signature(header):
+    """The extension implied by a file's first bytes, or None."""
+    for (offset, length), table in COMPILED_SIGNATURES:
+        ext = table.get(header[offset:offset + length])
+        if ext is not None:
+            return _refine(ext, header)
+    stripped = header.lstrip()
+    if (stripped.startswith(b"<svg") or stripped.startswith(b"<?xml")) and b"<svg" in header:
+        return ".svg"
+    return None
+
+
+def read_header(path, size=SNIFF_BYTES):
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        if hasattr(os, "pread"):
+            return os.pread(fd, size, 0)
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
+
+
+class ContentSniffer:
+    """
+    Guesses an extension from a file's first SNIFF_BYTES bytes (one read,
+    never the whole file). Results are cached by (device, inode, mtime).
+    """
+
+    def __init__(self, header_bytes=SNIFF_BYTES, cache_size=CACHE_SIZE):
+        self.header_bytes = header_bytes
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def sniff(self, path, st=None):
+        try:
+            st = st or os.stat(path)
+        except OSError:
+            return None
+        key = (st.st_dev, st.st_ino, st.st_mtime_ns)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        try:
+            ext = match_signature(read_header(path, self.header_bytes))
+        except OSError:
+            return None
+
+        with self._lock:
+            self._cache[key] = ext
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return ext
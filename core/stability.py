@@ -0,0 +1,122 @@
+import heapq
+import os
+import threading
+import time
+
+from core.config import STABILITY_INTERVAL
+from core.metrics import METRICS
+
+
+def is_open_for_write(path):
+    """
+    Best-effort check whether another process still has `path` open for writing.
+    Returns True/False, or None when the platform or filesystem cannot tell.
+    Elsewhere than Windows there is no probe that leaves the file alone (a
+    lease would make this process the target of SIGIO when a writer reopens
+    it), so size and mtime stability decide on their own.
+    """
+    if os.name == "nt":
+        # Writers hold the file without share-write, so appending fails
+        try:
+            with open(path, "ab"):
+                return False
+        except PermissionError:
+            return True
+        except OSError:
+            return None
+
+    return None
+
+
+class StabilityTracker:
+    """
+    Holds newly created files until they stop changing.
+    A path is released to `on_stable` once two checks `interval` seconds
+    apart see the same size and mtime and no writer has it open.
+    track() never blocks: all stat calls happen on the tracker's own thread.
+    Errors on_stable() lets escape are counted and reported through `log`.
+    """
+
+    def __init__(self, on_stable, interval=STABILITY_INTERVAL, log=None):
+        self.on_stable = on_stable
+        self.interval = interval
+        self.log = log
+        self._heap = []
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="autosort-stability", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._heap.clear()
+            self._pending.clear()
+            self._cond.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def track(self, path):
+        with self._cond:
+            if path in self._pending:
+                self._pending[path] = None  # changed again, start over
+                return
+            self._pending[path] = None
+            heapq.heappush(self._heap, (time.monotonic(), path))
+            self._cond.notify()
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and (not self._heap or self._heap[0][0] > time.monotonic()):
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._cond.wait(timeout)
+                if not self._running:
+                    return
+                _, path = heapq.heappop(self._heap)
+                previous = self._pending.get(path)
+
+            current = self._snapshot(path)
+            busy = current is not None and current == previous and is_open_for_write(path)
+            released = False
+            with self._cond:
+                if path not in self._pending:
+                    continue
+                if current is None:
+                    del self._pending[path]  # gone (deleted or renamed away)
+                    continue
+                if current == previous and self._pending[path] == previous and not busy:
+                    del self._pending[path]
+                    released = True
+                else:
+                    self._pending[path] = current
+                    heapq.heappush(self._heap, (time.monotonic() + self.interval, path))
+
+            if released:
+                try:
+                    self.on_stable(path)
+                except Exception as e:
+                    # Keep tracking the other files
+                    METRICS.incr("errors")
+                    if self.log:
+                        self.log(f"Error releasing {path}: {type(e).__name__}: {e}", "error")
+
+    @staticmethod
+    def _snapshot(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
@@ -0,0 +1,51 @@
+import fnmatch
+import os
+import re
+
+
+def compile_excludes(patterns):
+    """
+    Fold glob patterns for folder names (e.g. ".git", "node_*") into one
+    regex. Returns a match function, or None when there is nothing to exclude.
+    """
+    if not patterns:
+        return None
+    regex = re.compile("|".join(fnmatch.translate(p) for p in patterns), re.IGNORECASE)
+    return regex.match
+
+
+def walk_files(root, prune=(), excluded=None, max_depth=None):
+    """Lazily yield (name, path) for the regular files under `root`; see walk_entries()."""
+    for entry in walk_entries(root, prune, excluded, max_depth):
+        yield entry.name, entry.path
+
+
+def walk_entries(root, prune=(), excluded=None, max_depth=None):
+    """
+    Lazily yield the os.DirEntry of every regular file under `root`.
+    Folders named in `prune` are skipped at the top level only (the
+    organizer's own category folders), folders matching `excluded` at any
+    level, and nothing deeper than `max_depth` levels below `root` is read.
+    Only the pending folder paths are kept in memory, never the file list.
+    """
+    stack = [(root, 0)]
+    while stack:
+        directory, depth = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if max_depth is not None and depth >= max_depth:
+                                continue
+                            if depth == 0 and entry.name in prune:
+                                continue
+                            if excluded and excluded(entry.name):
+                                continue
+                            stack.append((entry.path, depth + 1))
+                        elif entry.is_file():
+                            yield entry
+                    except OSError:
+                        continue
+        except OSError:
+            continue
@@ -0,0 +1,122 @@
+import heapq
+import threading
+import time
+
+from core.config import EVENT_DEBOUNCE, MOVE_WORKERS, QUEUE_SIZE
+from core.metrics import METRICS
+
+
+class WorkQueue:
+    """
+    Bounded, deduplicating queue of paths between the watcher and the movers.
+    Repeated events for a queued path only push its due time back by
+    `debounce`; a path re-submitted while a worker holds it is requeued
+    once that worker is done. put() blocks while the queue is full.
+    Errors process() lets escape are counted and reported through `log`.
+    """
+
+    def __init__(self, process, workers=MOVE_WORKERS, maxsize=QUEUE_SIZE, debounce=EVENT_DEBOUNCE, log=None):
+        self.process = process
+        self.log = log
+        self.workers = max(1, int(workers))
+        self.maxsize = max(1, int(maxsize))
+        self.debounce = debounce
+        self._due = {}
+        self._since = {}
+        self._heap = []
+        self._in_flight = set()
+        self._dirty = set()
+        self._cond = threading.Condition()
+        self._running = False
+        self._threads = []
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._threads = [
+            threading.Thread(target=self._work, name=f"autosort-mover-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._due.clear()
+            self._since.clear()
+            self._heap.clear()
+            self._dirty.clear()
+            self._cond.notify_all()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join()
+        self._threads = []
+
+    def put(self, path):
+        with self._cond:
+            if path in self._in_flight:
+                self._dirty.add(path)
+                return
+            while path not in self._due and len(self._due) >= self.maxsize and self._running:
+                self._cond.wait()
+            if not self._running:
+                return
+            self._schedule(path)
+
+    def depth(self):
+        with self._cond:
+            return len(self._due) + len(self._in_flight)
+
+    def _schedule(self, path):
+        now = time.monotonic()
+        due = now + self.debounce
+        self._since.setdefault(path, now)
+        self._due[path] = due
+        heapq.heappush(self._heap, (due, path))
+        self._cond.notify_all()
+
+    def _next(self):
+        with self._cond:
+            while self._running:
+                # Drop heap entries superseded by a later event for the same path
+                while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+                    heapq.heappop(self._heap)
+                if self._heap:
+                    timeout = self._heap[0][0] - time.monotonic()
+                    if timeout <= 0:
+                        _, path = heapq.heappop(self._heap)
+                        del self._due[path]
+                        METRICS.observe("event_lag_seconds", time.monotonic() - self._since.pop(path))
+                        self._in_flight.add(path)
+                        self._cond.notify_all()
+                        return path
+                else:
+                    timeout = None
+                self._cond.wait(timeout)
+            return None
+
+    def _done(self, path):
+        with self._cond:
+            self._in_flight.discard(path)
+            if path in self._dirty:
+                self._dirty.discard(path)
+                if self._running:
+                    self._schedule(path)
+
+    def _work(self):
+        while True:
+            path = self._next()
+            if path is None:
+                return
+            try:
+                self.process(path)
+            except Exception as e:
+                # One failing file must not take the worker down with it
+                METRICS.incr("errors")
+                if self.log:
+                    self.log(f"Error processing {path}: {type(e).__name__}: {e}", "error")
+            finally:
+                self._done(path)
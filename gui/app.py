@@ -1,12 +1,28 @@
 import os
 import time
+import queue
 import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 
-from core.config import WATCH_DIR, CONFIG, save_config
+from core.config import WATCH_DIR, CONFIG, FILE_CATEGORIES, MATCH_RULES, LOG_FILE, LOG_MAX_LINES, save_config
+from core.dir_stats import DirectoryStats, UNSORTED
+from core.journal import default_journal
+from core.metrics import METRICS
 from core.organizer import DirOrganizer
-from utils.file_utils import validate_directory
+from core.rules import RuleIndex
+from utils.file_utils import format_size, validate_directory
+
+LOG_PREFIXES = {
+    "success": "[SUCCESS]",
+    "warning": "[WARNING]",
+    "error": "[ERROR]",
+    "move": "[MOVE]",
+}
+LOG_FLUSH_MS = 100      # How often the Tk thread drains queued log records
+LOG_BATCH_LIMIT = 500   # Records handled per drain, so the UI never stalls
+STATS_REFRESH_MS = 1000
+STATS_STAGES = ("move", "claim", "makedirs", "dedup", "stat", "classify", "report")
 
 class FileOrganizerGUI:
     def __init__(self, root):
@@ -26,10 +42,17 @@ class FileOrganizerGUI:
         self.observer = None
         self.organizer = None
         self.gui_handler = None
+        self.dir_stats = None
+
+        # Worker threads only ever put() here; the Tk thread applies the records
+        self._events = queue.SimpleQueue()
+        self._log_file = open(LOG_FILE, "a", encoding="utf-8") if LOG_FILE else None
 
         self.setup_style()
         self.create_widgets()
         self.update_status()
+        self.root.after(LOG_FLUSH_MS, self._drain_events)
+        self.root.after(STATS_REFRESH_MS, self._refresh_stats)
 
     def setup_style(self):
         self.style = ttk.Style()
@@ -204,9 +227,26 @@ class FileOrganizerGUI:
                                        command=self.organize_existing, style='Primary.TButton')
         self.organize_btn.pack(side=tk.LEFT, padx=(0, 10))
 
+        self.preview_btn = ttk.Button(button_container, text="Preview",
+                                      command=self.preview_organization, style='TButton')
+        self.preview_btn.pack(side=tk.LEFT, padx=(0, 10))
+
         self.stop_btn = ttk.Button(button_container, text="Stop All",
                                    command=self.stop_all, style='Danger.TButton', state='disabled')
-        self.stop_btn.pack(side=tk.LEFT)
+        self.stop_btn.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.undo_btn = ttk.Button(button_container, text="Undo Last Run",
+                                   command=self.undo_last_run, style='TButton')
+        self.undo_btn.pack(side=tk.LEFT)
+        if default_journal() is None:
+            self.undo_btn.config(state='disabled')
+
+        stats_frame = ttk.LabelFrame(main_frame, text="Statistics", padding="15")
+        stats_frame.pack(fill=tk.X, pady=(0, 20))
+
+        self.stats_label = ttk.Label(stats_frame, text="No activity yet",
+                                     font=('Segoe UI', 9), justify=tk.LEFT)
+        self.stats_label.pack(side=tk.LEFT)
 
         log_frame = ttk.LabelFrame(main_frame, text="Activity Log", padding="15")
         log_frame.pack(fill=tk.BOTH, expand=True)
@@ -260,32 +300,56 @@ class FileOrganizerGUI:
             self.update_status()
 
     def update_status(self):
+        # The folder is scanned on a background thread; _refresh_stats shows the result
         directory = self.dir_var.get()
-        if os.path.exists(directory):
-            file_count = len([f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f))])
-            self.files_label.config(text=f"Files in directory: {file_count}")
+        if not directory:
+            self.dir_stats = None
+            return
+        rules = RuleIndex(FILE_CATEGORIES, MATCH_RULES)
+        # Recount into the same instance: a running organizer keeps a reference to it
+        if self.dir_stats is None:
+            self.dir_stats = DirectoryStats(directory, rules)
+            self.dir_stats.start()
         else:
-            self.files_label.config(text="Directory does not exist")
+            self.dir_stats.rescan(directory, rules)
+        self.files_label.config(text="Counting files...")
 
     def log(self, message, message_type="info"):
-        self.log_text.config(state='normal')
         timestamp = time.strftime("%H:%M:%S")
-
-        if message_type == "success":
-            prefix = "[SUCCESS]"
-        elif message_type == "warning":
-            prefix = "[WARNING]"
-        elif message_type == "error":
-            prefix = "[ERROR]"
-        elif message_type == "move":
-            prefix = "[MOVE]"
-        else:
-            prefix = "[INFO]"
-
-        self.log_text.insert(tk.END, f"[{timestamp}] {prefix} {message}\n")
-        self.log_text.see(tk.END)
-        self.log_text.config(state='disabled')
-        self.root.update_idletasks()
+        prefix = LOG_PREFIXES.get(message_type, "[INFO]")
+        self._events.put(("log", f"[{timestamp}] {prefix} {message}\n"))
+
+    def _refresh_stats(self):
+        snap = METRICS.snapshot()
+        counters, gauges, stages = snap["counters"], snap["gauges"], snap["stages"]
+        lag = snap["values"].get("event_lag_seconds")
+
+        summary = (f"Moved: {counters.get('files_moved', 0)}   "
+                   f"Errors: {counters.get('files_error', 0)}   "
+                   f"Queued: {gauges.get('queue_depth', 0)}   "
+                   f"Waiting for writes: {gauges.get('pending_writes', 0)}")
+        if lag:
+            summary += f"   Event lag: {lag['last']:.2f}s (max {lag['max']:.2f}s)"
+        timings = "   ".join(f"{stage} {stages[stage]['avg_ms']:.2f}ms"
+                               for stage in STATS_STAGES if stage in stages)
+        if timings:
+            summary += f"\nAverage per call:   {timings}"
+
+        if self.dir_stats is not None and self.dir_stats.missing:
+            self.files_label.config(text="Directory does not exist")
+        elif self.dir_stats is not None and self.dir_stats.ready:
+            totals = self.dir_stats.snapshot()
+            files, size = totals.pop(UNSORTED)
+            if self.file_count == 0:
+                self.files_label.config(text=f"Files in directory: {files}")
+            folders = "   ".join(f"{category}: {count} ({format_size(total)})"
+                                 for category, (count, total) in sorted(totals.items()))
+            summary += f"\nUnsorted: {files} ({format_size(size)})"
+            if folders:
+                summary += f"   {folders}"
+
+        self.stats_label.config(text=summary)
+        self.root.after(STATS_REFRESH_MS, self._refresh_stats)
 
     def clear_log(self):
         self.log_text.config(state='normal')
@@ -294,8 +358,54 @@ class FileOrganizerGUI:
         self.log("Log cleared", "info")
 
     def increment_file_count(self):
-        self.file_count += 1
-        self.files_label.config(text=f"Files organized: {self.file_count}")
+        self._events.put(("count", 1))
+
+    def _drain_events(self):
+        lines = []
+        organized = 0
+        rescan = False
+        undo = []
+        try:
+            for _ in range(LOG_BATCH_LIMIT):
+                kind, value = self._events.get_nowait()
+                if kind == "log":
+                    lines.append(value)
+                elif kind == "rescan":
+                    rescan = True
+                elif kind == "undo":
+                    undo.append(value)
+                else:
+                    organized += value
+            backlog = True
+        except queue.Empty:
+            backlog = False
+
+        if lines:
+            text = "".join(lines)
+            self.log_text.config(state='normal')
+            self.log_text.insert(tk.END, text)
+            # Keep only the most recent LOG_MAX_LINES lines in the widget
+            line_count = int(self.log_text.index('end-1c').split('.')[0]) - 1
+            if line_count > LOG_MAX_LINES:
+                self.log_text.delete(1.0, f"{line_count - LOG_MAX_LINES + 1}.0")
+            self.log_text.see(tk.END)
+            self.log_text.config(state='disabled')
+
+            if self._log_file:
+                self._log_file.write(text)
+                self._log_file.flush()
+
+        if organized:
+            self.file_count += organized
+            self.files_label.config(text=f"Files organized: {self.file_count}")
+
+        if rescan:
+            self.update_status()
+
+        for run in undo:
+            self._confirm_undo(run)
+
+        self.root.after(1 if backlog else LOG_FLUSH_MS, self._drain_events)
 
     def start_watching(self):
         directory = self.dir_var.get()
@@ -304,7 +414,7 @@ class FileOrganizerGUI:
             return
 
         try:
-            self.organizer = DirOrganizer(directory, self)
+            self.organizer = DirOrganizer(directory, self, dir_stats=self.dir_stats)
 
             self.log("Organizing existing files...", "info")
             self.is_organizing = True
@@ -356,6 +466,8 @@ class FileOrganizerGUI:
         if self.is_organizing or self.is_watching:
             self.start_btn.config(state='disabled')
             self.organize_btn.config(state='disabled')
+            # Restored files would land in the watched folder and be sorted again
+            self.undo_btn.config(state='disabled')
             self.stop_btn.config(state='normal')
 
             if self.is_organizing:
@@ -367,6 +479,7 @@ class FileOrganizerGUI:
         else:
             self.start_btn.config(state='normal')
             self.organize_btn.config(state='normal')
+            self.undo_btn.config(state='normal' if default_journal() is not None else 'disabled')
             self.stop_btn.config(state='disabled')
             self.status_label.config(text="Not Running", style='Status.NotRunning.TLabel')
             self.stop_requested = False
@@ -382,7 +495,7 @@ class FileOrganizerGUI:
             self.update_button_states()
             self.log("Starting to organize existing files...", "info")
 
-            organizer = DirOrganizer(directory, self)
+            organizer = DirOrganizer(directory, self, dir_stats=self.dir_stats)
             organizer._classify_existing_files_gui()
 
             self.is_organizing = False
@@ -391,3 +504,49 @@ class FileOrganizerGUI:
 
         thread = threading.Thread(target=organize_thread, daemon=True)
         thread.start()
+
+    def preview_organization(self):
+        directory = self.dir_var.get()
+        if not os.path.exists(directory):
+            messagebox.showerror("Error", "The selected directory does not exist!")
+            return
+
+        def preview_thread():
+            self.log("Planning (nothing will be moved)...", "info")
+            summary = DirOrganizer(directory, self).plan().summary()
+            self.log(f"Preview: {summary['files']} files ({format_size(summary['bytes'])}) "
+                     f"would be organized, {summary['renamed']} renamed as duplicates", "success")
+            for category, totals in summary["categories"].items():
+                self.log(f"  {category}: {totals['files']} files, {format_size(totals['bytes'])}", "info")
+
+        threading.Thread(target=preview_thread, daemon=True).start()
+
+    def undo_last_run(self):
+        # Reading the run list touches the disk, so it happens off the Tk thread
+        def runs_thread():
+            runs = [run for run in default_journal().runs() if run["moves"] > run["undone"]]
+            self._events.put(("undo", runs[-1] if runs else None))
+
+        threading.Thread(target=runs_thread, daemon=True).start()
+
+    def _confirm_undo(self, run):
+        if self.is_watching or self.is_organizing:
+            return  # started while the run list was being read
+        if run is None:
+            messagebox.showinfo("Undo", "There is nothing to undo.")
+            return
+
+        journal = default_journal()
+        started = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["time"]))
+        if not messagebox.askyesno("Undo Last Run",
+                                   f"Move the {run['moves'] - run['undone']} files organized in the run started "
+                                   f"at {started} back to where they were?"):
+            return
+
+        def undo_thread():
+            self.log(f"Undoing run started at {started}...", "info")
+            restored = journal.undo(run_id=run["id"], log=self.log)
+            self.log(f"Restored {restored} files to their original location", "success")
+            self._events.put(("rescan", None))
+
+        threading.Thread(target=undo_thread, daemon=True).start()
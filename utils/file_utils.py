@@ -1,4 +1,6 @@
 import os
+import re
+import threading
 
 def resolve_duplicate(destination_path):
     """
@@ -19,6 +21,140 @@ def resolve_duplicate(destination_path):
     return new_path
 
 
+DUPLICATE_SUFFIX = re.compile(r"^(.*) \((\d+)\)$")
+
+
+class _DirNames:
+    __slots__ = ("names", "highest")
+
+    def __init__(self):
+        self.names = set()
+        self.highest = {}
+
+    def add(self, name):
+        self.names.add(os.path.normcase(name))
+        base, ext = os.path.splitext(name)
+        match = DUPLICATE_SUFFIX.match(base)
+        if match:
+            key = (os.path.normcase(match.group(1)), os.path.normcase(ext))
+            counter = int(match.group(2))
+            if counter > self.highest.get(key, 0):
+                self.highest[key] = counter
+
+    def __contains__(self, name):
+        return os.path.normcase(name) in self.names
+
+
+class NameIndex:
+    """
+    In-memory duplicate resolver: the names in each destination folder and
+    the highest "(N)" suffix per file name, seeded by one scandir the first
+    time a folder is used. A new name costs a dict lookup instead of one
+    os.path.exists per "(N)" candidate.
+    Claimed names are created exclusively on disk, so a file that appeared
+    behind the index's back is never overwritten.
+    Example: file.pdf, file (7).pdf exist → file (8).pdf
+    """
+
+    def __init__(self):
+        self._dirs = {}
+        self._lock = threading.Lock()
+
+    def _folder(self, directory):
+        folder = self._dirs.get(directory)
+        if folder is None:
+            folder = _DirNames()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        folder.add(entry.name)
+            except OSError:
+                pass
+            self._dirs[directory] = folder
+        return folder
+
+    def _next_name(self, folder, name):
+        if name not in folder:
+            return name
+        base, ext = os.path.splitext(name)
+        key = (os.path.normcase(base), os.path.normcase(ext))
+        counter = folder.highest.get(key, 0) + 1
+        candidate = f"{base} ({counter}){ext}"
+        while candidate in folder:
+            counter += 1
+            candidate = f"{base} ({counter}){ext}"
+        return candidate
+
+    def claim(self, destination_path, rename=True):
+        """
+        Return the path to move a file to and hold it with an empty placeholder.
+        Without `rename` the path is returned as is (existing files are overwritten).
+        """
+        if not rename:
+            return destination_path
+
+        directory, name = os.path.split(destination_path)
+        while True:
+            with self._lock:
+                folder = self._folder(directory)
+                # The index is never re-read, so a name it holds may have been
+                # deleted since; one lexists on a collision keeps it honest
+                if name in folder and not os.path.lexists(destination_path):
+                    folder.names.discard(os.path.normcase(name))
+                candidate = self._next_name(folder, name)
+                folder.add(candidate)
+
+            path = os.path.join(directory, candidate)
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return path
+            except FileExistsError:
+                continue  # created by someone else since the folder was indexed
+
+    def preview(self, destination_path):
+        """
+        Like claim(), but only records the name in memory. Used to plan
+        moves without touching the destination folders.
+        """
+        directory, name = os.path.split(destination_path)
+        with self._lock:
+            folder = self._folder(directory)
+            candidate = self._next_name(folder, name)
+            folder.add(candidate)
+        return os.path.join(directory, candidate)
+
+    def abandon(self, destination_path):
+        """Give back a claimed path whose move failed."""
+        try:
+            if os.path.getsize(destination_path) == 0:
+                os.remove(destination_path)
+        except OSError:
+            pass
+        directory, name = os.path.split(destination_path)
+        with self._lock:
+            folder = self._dirs.get(directory)
+            if folder is not None:
+                folder.names.discard(os.path.normcase(name))
+
+    def forget(self, directory=None):
+        """Drop cached folders so they are re-read from disk on next use."""
+        with self._lock:
+            if directory is None:
+                self._dirs.clear()
+            else:
+                self._dirs.pop(directory, None)
+
+
+def format_size(num_bytes):
+    """Example: 1536 → 1.5 KB"""
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
 def validate_directory(path):
     if not os.path.exists(path):
         return False, "The folder does not exist."